@@ -1 +1 @@
-from .version import __version__, __author__
\ No newline at end of file
+from app.version import __version__, __author__
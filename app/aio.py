@@ -0,0 +1,122 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# asyncio facade over AquaTTS. Inference runs on a dedicated thread pool sized to the
+# torch thread configuration, model loads on their own thread (a cold load never stalls
+# the streams already running); coroutines share the loaded engines of a ModelPool.
+#
+#   tts = AsyncAquaTTS("tts_models/en/ljspeech/vits")
+#   samples, sr = await tts.synthesize("Hello there.")
+#   async for chunk, sr in tts.stream("First sentence. Second one."):
+#       ...
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.parallel import available_cpus
+from app.pcm import wav_bytes
+
+def _intra_op_threads(pool) -> int:
+    '''Threads each forward pass will use: what the engines apply, else torch's default'''
+    from app.threads import ThreadConfig
+    cfg = getattr(pool, "threads", None) or ThreadConfig.load()
+    if cfg.intra_op:
+        return cfg.intra_op
+    import torch
+    return max(1, torch.get_num_threads())
+
+async def _finish(step):
+    '''Wait until an executor step has really returned, even if cancelled again meanwhile'''
+    cancelled = False
+    while not step.done():
+        try:
+            await asyncio.shield(asyncio.wrap_future(step))
+        except asyncio.CancelledError:
+            cancelled = True
+        except Exception:
+            break
+    if cancelled:
+        raise asyncio.CancelledError()
+
+class AsyncAquaTTS:
+    def __init__(self, default_model: str, max_concurrency: int = None, workers: int = None, pool=None):
+        if pool is None:
+            from app.model_pool import ModelPool
+            pool = ModelPool()
+        self.pool = pool
+        self.default_model = default_model
+        if workers is None:
+            # Each engine runs one forward pass at a time on intra_op threads:
+            # more workers than cpus // intra_op only oversubscribes the cores
+            workers = max(1, available_cpus() // _intra_op_threads(pool))
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ajtts-aio")
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ajtts-aio-load")
+        # Requests beyond this wait (backpressure) instead of piling up on the executor
+        self.max_concurrency = max_concurrency or workers * 2
+        self._slots = None # asyncio.Semaphore, bound to the running loop on first use
+
+    async def engine(self, model_name: str = None):
+        '''Loaded AquaTTS for model_name (loading runs on the executor)'''
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._loader, self.pool.get, model_name or self.default_model)
+
+    async def stream(self, text: str, model_name: str = None):
+        '''Async iterator of (samples, sample_rate) per sentence. The next sentence is
+        synthesized while the consumer handles the current one; cancelling the consumer
+        stops synthesis, mid-sentence where the model allows it'''
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        async with self._slots:
+            engine = await self.engine(model_name)
+            from app.tts_engine import CancelToken
+            cancel = CancelToken() # also interrupts the sentence in progress
+            chunks = engine.iter_pcm_chunks(text, cancel=cancel)
+            # One step in flight at a time: a generator cannot run on two threads.
+            # Keep the concurrent future: cancelling an asyncio wrapper does not stop
+            # the executor thread that is inside next(chunks)
+            step = self._executor.submit(next, chunks, None)
+            try:
+                while True:
+                    chunk = await asyncio.wrap_future(step)
+                    step = None
+                    if chunk is None:
+                        break
+                    step = self._executor.submit(next, chunks, None)
+                    yield chunk
+            finally:
+                cancel.set()
+                try:
+                    if step is not None:
+                        # The running sentence stops at its next model stage
+                        await _finish(step)
+                finally:
+                    chunks.close()
+
+    async def synthesize(self, text: str, model_name: str = None):
+        '''(samples, sample_rate) for the whole text'''
+        parts = []
+        sr = 0
+        async for chunk, sr in self.stream(text, model_name):
+            parts.append(chunk)
+        if not parts:
+            raise ValueError("Empty text")
+        return np.concatenate(parts), sr
+
+    async def synthesize_wav(self, text: str, model_name: str = None) -> bytes:
+        samples, sr = await self.synthesize(text, model_name)
+        return wav_bytes(samples, sr)
+
+    async def aclose(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown, True)
+        await loop.run_in_executor(None, self._loader.shutdown, True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
@@ -0,0 +1,190 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Content-addressed cache of synthesized audio: RAM (LRU) in front of disk (WAV files).
+# The disk tier is opt-in (AJTTS_AUDIO_CACHE_DISK_MB > 0): it would otherwise keep every
+# spoken clipboard snippet around as a WAV file.
+
+import os
+import json
+import wave
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from app.pcm import to_float32, write_wav
+
+AUDIO_CACHE_DIR = Path(os.environ.get(
+    "AJTTS_AUDIO_CACHE_DIR", Path.home() / ".local" / "share" / "tts" / "ajtts_audio"
+))
+AUDIO_CACHE_MEM_MB = int(os.environ.get("AJTTS_AUDIO_CACHE_MEM_MB", "64"))
+AUDIO_CACHE_DISK_MB = int(os.environ.get("AJTTS_AUDIO_CACHE_DISK_MB", "0")) # 0: memory only
+
+def cache_key(model_identity: str, text: str, params: dict = None) -> str:
+    '''sha256 over (model + config, whitespace-normalized text, synthesis params)'''
+    payload = json.dumps({
+        "model": model_identity,
+        "text": " ".join(text.split()),
+        "params": params or {},
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class AudioCache:
+    def __init__(self, cache_dir=None, mem_mb: int = None, disk_mb: int = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else AUDIO_CACHE_DIR
+        self.mem_bytes_max = (mem_mb if mem_mb is not None else AUDIO_CACHE_MEM_MB) * 1024 * 1024
+        self.disk_bytes_max = (disk_mb if disk_mb is not None else AUDIO_CACHE_DISK_MB) * 1024 * 1024
+
+        self._mem = OrderedDict() # key -> (samples, sample_rate)
+        self._mem_bytes = 0
+        self._disk_bytes = None # scanned lazily
+        self._lock = threading.Lock()
+
+        self.mem_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.mem_evictions = 0
+        self.disk_evictions = 0
+
+    def get(self, key: str):
+        '''(samples, sample_rate) or None'''
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                self._mem.move_to_end(key)
+                self.mem_hits += 1
+                return hit
+            if self.disk_bytes_max <= 0:
+                self.misses += 1
+                return None
+
+        path = self._path(key)
+        try:
+            samples, sr = self._read(path)
+            os.utime(path) # mtime is the LRU clock on disk
+        except (FileNotFoundError, wave.Error, EOFError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, samples, sr)
+        return samples, sr
+
+    def put(self, key: str, samples, sample_rate: int):
+        samples = to_float32(samples).copy()
+        samples.setflags(write=False)
+        with self._lock:
+            self._remember(key, samples, sample_rate)
+        if self.disk_bytes_max > 0:
+            self._store(key, samples, sample_rate)
+
+    def clear(self, disk: bool = False):
+        with self._lock:
+            self._mem.clear()
+            self._mem_bytes = 0
+            if disk:
+                for f in self._disk_files():
+                    f.unlink(missing_ok=True)
+                self._disk_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.mem_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "mem_hits": self.mem_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (hits / lookups) if lookups else 0.0,
+                "mem_evictions": self.mem_evictions,
+                "disk_evictions": self.disk_evictions,
+                "mem_entries": len(self._mem),
+                "mem_bytes": self._mem_bytes,
+                "disk_bytes": self._disk_bytes,
+            }
+
+    # Memory tier (call with self._lock held)
+    def _remember(self, key, samples, sr):
+        if key in self._mem:
+            self._mem_bytes -= self._mem.pop(key)[0].nbytes
+        if samples.nbytes > self.mem_bytes_max:
+            return
+        self._mem[key] = (samples, int(sr))
+        self._mem_bytes += samples.nbytes
+        while self._mem_bytes > self.mem_bytes_max and self._mem:
+            _, (old, _) = self._mem.popitem(last=False)
+            self._mem_bytes -= old.nbytes
+            self.mem_evictions += 1
+
+    # Disk tier
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.wav"
+
+    def _disk_files(self):
+        return self.cache_dir.glob("*/*.wav") if self.cache_dir.exists() else []
+
+    @staticmethod
+    def _read(path: Path):
+        with wave.open(str(path), "rb") as w:
+            sr = w.getframerate()
+            data = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+        samples = to_float32(data)
+        samples.setflags(write=False)
+        return samples, sr
+
+    def _store(self, key, samples, sr):
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            write_wav(str(tmp), samples, sr)
+            os.replace(tmp, path)
+            size = path.stat().st_size
+        except OSError:
+            return
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(f.stat().st_size for f in self._disk_files())
+            else:
+                self._disk_bytes += size
+            if self._disk_bytes > self.disk_bytes_max:
+                self._evict_disk()
+
+    def _evict_disk(self):
+        files = []
+        for f in self._disk_files():
+            try:
+                st = f.stat()
+                files.append((st.st_mtime, st.st_size, f))
+            except FileNotFoundError:
+                pass
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        # Evict down to 90% so we do not rescan on every store
+        target = int(self.disk_bytes_max * 0.9)
+        for _, size, f in files:
+            if total <= target:
+                break
+            f.unlink(missing_ok=True)
+            total -= size
+            self.disk_evictions += 1
+        self._disk_bytes = total
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def default_audio_cache():
+    '''Process-wide cache shared by all engines; None if AJTTS_AUDIO_CACHE=0'''
+    global _default_cache
+    if os.environ.get("AJTTS_AUDIO_CACHE", "1") == "0":
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = AudioCache()
+        return _default_cache
@@ -0,0 +1,286 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Batch renderer: text files / JSONL utterances -> WAV files, no GUI.
+#
+#   python -m app.batch texts/ -o out/ --model tts_models/es/css10/vits --workers 4
+#   python -m app.batch utterances.jsonl -o out/       ({"id": "...", "text": "..."} per line)
+#   cat lines.txt | python -m app.batch - -o out/       (one utterance per line)
+#
+# Reading, normalization, synthesis and encoding run as pipelined stages joined by
+# bounded queues, so memory stays flat however many inputs there are.
+
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+
+import numpy as np
+
+QUEUE_SIZE = 16 # items waiting between two stages
+_DONE = object()
+
+@dataclass
+class Job:
+    id: str
+    text: str
+    out: Path = None
+    samples: object = None
+    sample_rate: int = 0
+    submitted: float = 0.0
+    synth_s: float = 0.0
+    error: str = None
+    meta: dict = field(default_factory=dict)
+
+def _safe_name(name: str) -> str:
+    keep = "".join(c if c.isalnum() or c in "-_." else "_" for c in name).strip("._")
+    return keep or "item"
+
+def iter_inputs(sources):
+    '''Yields (id, text) lazily from directories, .txt, .jsonl and "-" (stdin, line per item).
+    A malformed JSONL line yields (id, ValueError) so it fails alone'''
+    for src in sources:
+        if src == "-":
+            for i, line in enumerate(sys.stdin, 1):
+                if line.strip():
+                    yield from _parse_line(line, f"stdin-{i:06d}")
+            continue
+        p = Path(src)
+        if p.is_dir():
+            with os.scandir(p) as it:
+                names = sorted(e.name for e in it if e.is_file() and e.name.endswith(".txt"))
+            for name in names:
+                yield Path(name).stem, (p / name).read_text(encoding="utf-8")
+        elif p.suffix == ".jsonl":
+            with open(p, encoding="utf-8") as f:
+                for i, line in enumerate(f, 1):
+                    if line.strip():
+                        yield from _parse_line(line, f"{p.stem}-{i:06d}")
+        else:
+            yield p.stem, p.read_text(encoding="utf-8")
+
+def _parse_line(line: str, default_id: str):
+    line = line.strip()
+    if line.startswith("{"):
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield default_id, ValueError(f"malformed JSON: {e}")
+            return
+        yield str(item.get("id") or default_id), str(item.get("text") or "")
+    else:
+        yield default_id, line
+
+def write_wav_atomic(path: Path, samples, sample_rate: int):
+    '''Readers never see a half-written file: write next to it, then rename'''
+    from app.pcm import write_wav
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        write_wav(tmp, samples, sample_rate)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+class _Engine:
+    '''In-process AquaTTS (batched sentences) or a ParallelSynthesizer (one process per worker)'''
+    def __init__(self, model_name: str, workers: int):
+        self.parallel = None
+        self.engine = None
+        if workers > 1:
+            from app.parallel import ParallelSynthesizer
+            self.parallel = ParallelSynthesizer(model_name, workers=workers)
+            self.parallel.warm_up()
+        else:
+            from app.tts_engine import AquaTTS
+            self.engine = AquaTTS(model_name)
+
+    def submit(self, text: str):
+        '''Future -> (samples, sample_rate); synthesize_long either way, so the audio does
+        not depend on the worker count'''
+        if self.parallel is not None:
+            return self.parallel.submit_long(text)
+        from concurrent.futures import Future
+        f = Future()
+        try:
+            f.set_result(self.engine.synthesize_long(text))
+        except Exception as e:
+            f.set_exception(e)
+        return f
+
+    def close(self):
+        if self.parallel is not None:
+            self.parallel.close()
+
+class BatchRenderer:
+    def __init__(self, model_name: str, out_dir, workers: int = 1, queue_size: int = QUEUE_SIZE,
+                 normalize: bool = True, overwrite: bool = False, log=None):
+        self.model_name = model_name
+        self.out_dir = Path(out_dir)
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.normalize = normalize
+        self.overwrite = overwrite
+        self.log = log or (lambda *_: None)
+        self.results = []
+        self.skipped = 0
+
+    def run(self, inputs) -> dict:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        to_normalize = queue.Queue(self.queue_size)
+        to_synthesize = queue.Queue(self.queue_size)
+        to_encode = queue.Queue(self.queue_size)
+        errors = []
+
+        t0 = time.perf_counter()
+        engine = _Engine(self.model_name, self.workers)
+        load_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+
+        def stage(fn, src, dst):
+            def loop():
+                try:
+                    while True:
+                        item = src.get()
+                        if item is _DONE:
+                            break
+                        fn(item, dst)
+                except BaseException as e:
+                    errors.append(e)
+                    # Keep draining so upstream never blocks on a full queue
+                    while src.get() is not _DONE:
+                        pass
+                finally:
+                    if dst is not None:
+                        dst.put(_DONE)
+            return threading.Thread(target=loop, daemon=True)
+
+        def normalize(job, dst):
+            if self.normalize:
+                from app.tts_engine import prepare_text
+                job.text = prepare_text(job.text, self.model_name)
+            if job.text.strip():
+                dst.put(job)
+            else:
+                job.error = "empty text"
+                self.results.append(job)
+
+        def synthesize(job, dst):
+            # Bounded dst: at most queue_size texts submitted ahead of the encoder
+            job.submitted = time.perf_counter()
+            dst.put((job, engine.submit(job.text)))
+
+        def encode(item, _dst):
+            job, future = item
+            try:
+                job.samples, job.sample_rate = future.result()
+                job.synth_s = time.perf_counter() - job.submitted
+                write_wav_atomic(job.out, job.samples, job.sample_rate)
+                job.meta["audio_s"] = len(job.samples) / float(job.sample_rate)
+                self.log(f"{job.id}: {job.meta['audio_s']:.1f}s audio")
+            except Exception as e:
+                job.error = str(e)
+                self.log(f"{job.id}: FAILED {e}")
+            job.samples = None # do not keep audio around
+            self.results.append(job)
+
+        threads = [stage(normalize, to_normalize, to_synthesize),
+                   stage(synthesize, to_synthesize, to_encode),
+                   stage(encode, to_encode, None)]
+        for t in threads:
+            t.start()
+
+        try:
+            seen = set()
+            for item_id, text in inputs:
+                if isinstance(text, Exception):
+                    self.results.append(Job(id=item_id, text="", error=str(text)))
+                    self.log(f"{item_id}: FAILED {text}")
+                    continue
+                base = name = _safe_name(item_id)
+                n = 1
+                while name in seen: # never reuse a name another item (real id or not) took
+                    name = f"{base}-{n}"
+                    n += 1
+                seen.add(name)
+                out = self.out_dir / f"{name}.wav"
+                if out.exists() and not self.overwrite:
+                    self.skipped += 1
+                    continue
+                to_normalize.put(Job(id=item_id, text=text, out=out))
+        finally:
+            to_normalize.put(_DONE)
+            for t in threads:
+                t.join()
+            engine.close()
+        if errors:
+            raise errors[0]
+
+        return self.summary(time.perf_counter() - t0, load_s)
+
+    def summary(self, wall_s: float, load_s: float) -> dict:
+        ok = [j for j in self.results if not j.error]
+        chars = sum(len(j.text) for j in ok)
+        audio_s = sum(j.meta["audio_s"] for j in ok)
+        rtfs = np.asarray([j.synth_s / j.meta["audio_s"] for j in ok if j.meta.get("audio_s")])
+        return {
+            "model": self.model_name,
+            "workers": self.workers,
+            "items": len(ok),
+            "failed": len(self.results) - len(ok),
+            "skipped": self.skipped,
+            "chars": chars,
+            "audio_s": round(audio_s, 2),
+            "load_s": round(load_s, 2),
+            "wall_s": round(wall_s, 2),
+            "chars_per_s": round(chars / wall_s, 1) if wall_s else 0.0,
+            "audio_s_per_s": round(audio_s / wall_s, 3) if wall_s else 0.0,
+            "rtf": round(wall_s / audio_s, 4) if audio_s else None, # whole run, all workers
+            "item_rtf": {"p50": round(float(np.percentile(rtfs, 50)), 4),
+                         "p95": round(float(np.percentile(rtfs, 95)), 4),
+                         "max": round(float(rtfs.max()), 4)} if rtfs.size else {},
+            "errors": {j.id: j.error for j in self.results if j.error},
+        }
+
+def print_summary(s: dict, out=sys.stderr):
+    print(f"\n{s['items']} rendered, {s['failed']} failed, {s['skipped']} skipped "
+          f"({s['model']}, {s['workers']} worker(s), load {s['load_s']}s)", file=out)
+    print(f"  wall {s['wall_s']}s  |  {s['chars']} chars, {s['audio_s']}s audio", file=out)
+    print(f"  throughput: {s['chars_per_s']} chars/s, {s['audio_s_per_s']} audio-s/s", file=out)
+    if s["rtf"] is not None:
+        r = s["item_rtf"]
+        print(f"  RTF: {s['rtf']} overall | per item p50 {r.get('p50')}  p95 {r.get('p95')}  "
+              f"max {r.get('max')}", file=out)
+    for item_id, err in list(s["errors"].items())[:10]:
+        print(f"  ! {item_id}: {err}", file=out)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.batch")
+    parser.add_argument("inputs", nargs="+", help="directories of .txt, .txt files, .jsonl files or - for stdin")
+    parser.add_argument("-o", "--out", required=True, help="output directory for the WAV files")
+    parser.add_argument("--model", default="tts_models/en/ljspeech/vits")
+    parser.add_argument("--workers", type=int, default=1, help="synthesis processes (1 = in-process)")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="bound of each stage queue")
+    parser.add_argument("--no-normalize", action="store_true", help="skip text repair/normalization")
+    parser.add_argument("--overwrite", action="store_true", help="re-render existing outputs")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON on stdout")
+    parser.add_argument("-q", "--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    renderer = BatchRenderer(args.model, args.out, args.workers, args.queue_size,
+                             normalize=not args.no_normalize, overwrite=args.overwrite,
+                             log=None if args.quiet else (lambda m: print(m, file=sys.stderr)))
+    summary = renderer.run(iter_inputs(args.inputs))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    print_summary(summary)
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,808 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Offline benchmarks. Run: python -m app.benchmark <what> [options]
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+EN_CORPUS = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Please save your work before closing the application.",
+    "In nineteen eighty-four, the company released its first personal computer.",
+    "Your download has finished. The new voice is ready to use.",
+    "According to the report, revenue grew by twelve percent last quarter.",
+    "Click the Speak button, or press Control Shift S, to read the clipboard aloud.",
+    "She sells seashells by the seashore, and the shells she sells are surely seashells.",
+    "Warning: the battery level is low. Please connect the charger.",
+    "The meeting has been moved to Thursday at three thirty in the afternoon.",
+    "Machine learning models can be surprisingly sensitive to their input data.",
+    "Please save your work before closing the application.",
+    "Your download has finished. The new voice is ready to use.",
+]
+
+ES_CORPUS = [
+    "El veloz murciélago hindú comía feliz cardillo y kiwi.",
+    "Por favor, guarde su trabajo antes de cerrar la aplicación.",
+    "En mil novecientos ochenta y cuatro la empresa lanzó su primera computadora.",
+    "La descarga ha terminado. La nueva voz está lista para usarse.",
+    "Según el informe, los ingresos crecieron un doce por ciento el último trimestre.",
+    "Presione el botón Hablar para leer el portapapeles en voz alta.",
+    "El tipo de cambio cerró hoy en quinientos diez colones por dólar.",
+    "Advertencia: el nivel de la batería es bajo. Conecte el cargador.",
+    "La reunión se trasladó al jueves a las tres y media de la tarde.",
+    "Los modelos de aprendizaje automático son sensibles a los datos de entrada.",
+    "Por favor, guarde su trabajo antes de cerrar la aplicación.",
+    "La descarga ha terminado. La nueva voz está lista para usarse.",
+]
+
+CORPORA = {"en": EN_CORPUS, "es": ES_CORPUS}
+
+BUILTIN_VOICES = ["tts_models/es/css10/vits", "tts_models/en/ljspeech/vits"]
+
+def rss_mb() -> float:
+    '''Current resident set size of this process, in MiB'''
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+def peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+def in_subprocess(fn, *args):
+    '''Run fn(*args) in a fresh interpreter (clean RSS, cold caches of this process)'''
+    import multiprocessing as mp
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn")) as pool:
+        return pool.submit(fn, *args).result()
+
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return time.perf_counter() - t0, out
+
+# Phonemization
+def bench_phonemizer(phonemizer, corpus, repeats: int = 3) -> dict:
+    '''Uncached vs cached (cold, warm, reloaded from disk) phonemization of corpus'''
+    from app.phoneme_cache import CachedPhonemizer, PhonemeStore
+
+    def run(ph):
+        for text in corpus:
+            ph.phonemize(text, separator="")
+
+    uncached = min(_timed(run, phonemizer)[0] for _ in range(repeats))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "phonemes.sqlite"
+        store = PhonemeStore(db)
+        cached = CachedPhonemizer(phonemizer, store)
+        cold, _ = _timed(run, cached)
+        warm = min(_timed(run, cached)[0] for _ in range(repeats))
+        store.flush()
+        reloaded, _ = _timed(run, CachedPhonemizer(phonemizer, PhonemeStore(db)))
+        stats = store.stats()
+
+    return {
+        "sentences": len(corpus),
+        "uncached_s": uncached,
+        "cached_cold_s": cold,
+        "cached_warm_s": warm,
+        "cached_from_disk_s": reloaded,
+        "speedup_warm": (uncached / warm) if warm else None,
+        "store": stats,
+    }
+
+# Batched inference
+def bench_batching(engine, sentences, batch_sizes=(1, 2, 4, 8), repeats: int = 2) -> dict:
+    '''Throughput of AquaTTS.synthesize_batch per batch size (engine should have no audio cache)'''
+    engine.synthesize_batch(sentences[:2], batch_size=1) # warm-up
+    results = {}
+    for bs in batch_sizes:
+        best, wavs = min((_timed(engine.synthesize_batch, sentences, batch_size=bs) for _ in range(repeats)),
+                         key=lambda r: r[0])
+        audio_s = sum(len(w) for w in wavs) / float(engine.sample_rate)
+        results[str(bs)] = {
+            "wall_s": best,
+            "sentences_per_s": len(sentences) / best,
+            "rtf": best / audio_s if audio_s else None,
+        }
+    base = results[str(batch_sizes[0])]["wall_s"]
+    for r in results.values():
+        r["speedup"] = base / r["wall_s"]
+    return results
+
+# Backends
+def bench_backends(model_name: str, sentences, backends=("torch", "onnx"), repeats: int = 2) -> dict:
+    '''Load time and per-utterance latency, side by side for each backend'''
+    import statistics
+    from app.tts_engine import AquaTTS
+
+    results = {}
+    for backend in backends:
+        load_s, engine = _timed(AquaTTS, model_name, audio_cache=False, backend=backend)
+        if engine.backend != backend:
+            results[backend] = {"skipped": f"fell back to {engine.backend}"}
+            continue
+        engine._infer(sentences[0], split_sentences=False) # warm-up
+        latencies, audio_s = [], 0.0
+        for _ in range(repeats):
+            for text in sentences:
+                dt, wav = _timed(engine._infer, text, split_sentences=False)
+                latencies.append(dt)
+                audio_s += len(wav) / float(engine.sample_rate)
+        results[backend] = {
+            "load_s": load_s,
+            "latency_mean_s": statistics.mean(latencies),
+            "latency_median_s": statistics.median(latencies),
+            "rtf": sum(latencies) / audio_s if audio_s else None,
+        }
+    return results
+
+def cmd_backends(args) -> int:
+    results = bench_backends(args.model, CORPORA[_lang_of(args.model)], repeats=args.repeats)
+    print(json.dumps({args.model: results}, indent=2))
+    return 0
+
+# Quantization
+def _bench_quant_variant(model_name: str, quantize: str, sentences) -> dict:
+    from app.tts_engine import AquaTTS
+
+    base = rss_mb()
+    load_s, engine = _timed(AquaTTS, model_name, audio_cache=False, backend="torch", quantize=quantize)
+    loaded = rss_mb()
+    engine._infer(sentences[0], split_sentences=False)
+    wall, audio_s = 0.0, 0.0
+    for text in sentences:
+        dt, wav = _timed(engine._infer, text, split_sentences=False)
+        wall += dt
+        audio_s += len(wav) / float(engine.sample_rate)
+    return {
+        "active": engine.quantization or "fp32",
+        "load_s": load_s,
+        "rtf": wall / audio_s if audio_s else None,
+        "model_rss_mb": loaded - base,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def bench_quantization(model_name: str, sentences) -> dict:
+    '''fp32 vs int8 RTF and memory, each variant in its own process'''
+    results = {}
+    for variant in ("", "int8"):
+        results[variant or "fp32"] = in_subprocess(_bench_quant_variant, model_name, variant, sentences)
+    return results
+
+def cmd_quant(args) -> int:
+    results = {m: bench_quantization(m, CORPORA[_lang_of(m)]) for m in args.models}
+    print(json.dumps(results, indent=2))
+    return 0
+
+def _lang_of(model_name: str) -> str:
+    return "es" if "/es/" in model_name else "en"
+
+def cmd_batch(args) -> int:
+    from app.tts_engine import AquaTTS
+
+    engine = AquaTTS(args.model, audio_cache=False)
+    if not engine.supports_batching():
+        print(f"{args.model}: batching not supported, measuring sequential only", file=sys.stderr)
+    corpus = CORPORA[_lang_of(args.model)] * args.scale
+    results = bench_batching(engine, corpus, tuple(args.batch_sizes), repeats=args.repeats)
+    print(json.dumps({args.model: results}, indent=2))
+    return 0
+
+# Cancellation
+CANCEL_BUDGET_S = 1.0 # max wall time from cancel to the synthesis thread being gone
+
+def bench_cancel(engine, text: str, cancel_after_s: float = 0.5, streaming: bool = False,
+                 idle_s: float = 1.0) -> dict:
+    '''CPU/wall time a long synthesis keeps using after its CancelToken is set
+    (engine should have no audio cache, or the text is answered from it)'''
+    import threading
+    from app.tts_engine import CancelToken, SynthesisCancelled
+
+    token = CancelToken()
+    outcome = {}
+
+    def run():
+        try:
+            if streaming:
+                outcome["chunks"] = sum(1 for _ in engine.iter_pcm_chunks(text, cancel=token))
+            else:
+                engine.synthesize_to_pcm(text, cancel=token)
+            outcome["result"] = "completed"
+        except SynthesisCancelled:
+            outcome["result"] = "cancelled"
+
+    worker = threading.Thread(target=run, daemon=True)
+    cpu0 = time.process_time()
+    worker.start()
+    time.sleep(cancel_after_s)
+    cpu_cancel, t_cancel = time.process_time(), time.perf_counter()
+    token.set()
+    worker.join()
+    stop_s = time.perf_counter() - t_cancel
+    cpu_stop = time.process_time()
+    time.sleep(idle_s) # nothing should keep burning CPU once the thread is gone
+    cpu_idle = time.process_time()
+    result = outcome.get("result", "error")
+    failures = []
+    if result != "cancelled": # "completed" means the text was too short to test anything
+        failures.append(f"synthesis {result}, expected SynthesisCancelled")
+    if stop_s > CANCEL_BUDGET_S:
+        failures.append(f"stopped after {stop_s:.2f}s, budget {CANCEL_BUDGET_S}s")
+    if cpu_idle - cpu_stop > idle_s * 0.25:
+        failures.append(f"{cpu_idle - cpu_stop:.2f}s CPU burnt after the worker stopped")
+    return {
+        "mode": "stream" if streaming else "whole",
+        "result": result,
+        "cpu_before_cancel_s": cpu_cancel - cpu0,
+        "stop_latency_s": stop_s,
+        "cpu_after_cancel_s": cpu_stop - cpu_cancel,
+        "cpu_idle_after_s": cpu_idle - cpu_stop,
+        "failures": failures,
+        "ok": not failures,
+    }
+
+def cmd_cancel(args) -> int:
+    from app.tts_engine import AquaTTS
+
+    engine = AquaTTS(args.model, audio_cache=False)
+    engine.warm_up()
+    text = " ".join(CORPORA[_lang_of(args.model)] * args.scale)
+    report = [bench_cancel(engine, text, args.after, streaming=mode == "stream")
+              for mode in ("whole", "stream")]
+    print(json.dumps({args.model: report}, indent=2))
+    failed = [r for r in report if not r["ok"]]
+    for r in failed:
+        for msg in r["failures"]:
+            print(f"FAIL ({r['mode']}): {msg}", file=sys.stderr)
+    return 1 if failed else 0
+
+# Preload: concurrent model preparation against a local stand-in for the download source
+PRELOAD_CHECK_DELAYS = [0.4, 0.1, 0.1, 0.1, 0.1] # seconds per fake download; the default is slowest
+
+def _preload_run(models, delays, max_workers: int) -> dict:
+    '''Runs in a fresh process whose HOME is a scratch dir: the stand-in installs there'''
+    import threading
+    from app.tts_engine import ensure_preinstalled_models, _cache_dir
+
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def fake_download(model_id):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        try:
+            time.sleep(delays[model_id])
+            folder = _cache_dir(model_id)
+            folder.mkdir(parents=True, exist_ok=True)
+            (folder / "config.json").write_text("{}")
+            (folder / "model_file.pth").write_bytes(b"\0")
+        finally:
+            with lock:
+                state["active"] -= 1
+
+    order = []
+    wall_s, ok = _timed(ensure_preinstalled_models, models, max_workers=max_workers,
+                        downloader=fake_download, on_ready=lambda m, ok: order.append([m, ok]))
+    return {"ok": ok, "ready_order": order, "peak_downloads": state["peak"],
+            "max_workers": max_workers, "wall_s": wall_s, "serial_s": sum(delays.values())}
+
+def check_preload(max_workers: int = 2, delays=PRELOAD_CHECK_DELAYS) -> dict:
+    '''ensure_preinstalled_models with a fake downloader: default voice first, bounded concurrency'''
+    import os
+    models = [f"tts_models/xx/ajtts-check/voice{i}" for i in range(len(delays))]
+    saved = {k: os.environ.get(k) for k in ("HOME", "AJTTS_MODEL_INDEX")}
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        os.environ["AJTTS_MODEL_INDEX"] = str(Path(home) / "ajtts_index.json")
+        try:
+            report = in_subprocess(_preload_run, models, dict(zip(models, delays)), max_workers)
+        finally:
+            for k, v in saved.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+    order = [m for m, _ in report["ready_order"]]
+    report["failures"] = [msg for bad, msg in [
+        (not report["ok"] or len(order) != len(models), "not every model was prepared"),
+        (not all(ok for _, ok in report["ready_order"]), "a model was reported as failed"),
+        (order[:1] != models[:1], "the default voice was not reported first"),
+        (report["peak_downloads"] > max_workers, "more concurrent downloads than max_workers"),
+        (max_workers > 1 and report["peak_downloads"] < 2, "downloads did not overlap"),
+    ] if bad]
+    return report
+
+def cmd_preload(args) -> int:
+    report = check_preload(args.workers)
+    print(json.dumps(report, indent=2))
+    for msg in report["failures"]:
+        print(f"FAIL: {msg}", file=sys.stderr)
+    return 1 if report["failures"] else 0
+
+# Downloads: resume / parallel ranges / checksums against a local HTTP server
+DOWNLOAD_CHECK_BYTES = 3 * 1024 * 1024 + 12345
+
+def _range_server(payload: bytes, cut_first: int = None):
+    '''Local HTTP server for payload with Range/If-Range/ETag; the first GET is cut after
+    cut_first bytes when set. Returns (server, url, log of Range headers seen)'''
+    import threading
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    etag = '"ajtts-check"'
+    seen = []
+    cut = [cut_first]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _headers(self, status, start, end):
+            self.send_response(status)
+            self.send_header("Content-Length", str(end - start))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", etag)
+            if status == 206:
+                self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(payload)}")
+            self.end_headers()
+
+        def do_HEAD(self):
+            self._headers(200, 0, len(payload))
+
+        def do_GET(self):
+            rng = self.headers.get("Range")
+            seen.append(rng)
+            start, end, status = 0, len(payload), 200
+            if rng and self.headers.get("If-Range", etag) == etag:
+                lo, _, hi = rng.split("=", 1)[1].partition("-")
+                start, end, status = int(lo), (int(hi) + 1 if hi else len(payload)), 206
+            self._headers(status, start, end)
+            if cut[0] is not None:
+                end, cut[0] = min(end, start + cut[0]), None
+                self.close_connection = True
+            self.wfile.write(payload[start:end])
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/model.bin", seen
+
+class _Hashes(dict):
+    def file_hash(self, url):
+        return self.get(url)
+
+    def record_file_hash(self, url, sha256):
+        self[url] = sha256
+
+def _download_model_run(url: str, tampered_url: str) -> str:
+    '''Fresh process, HOME = scratch dir: first install records, reinstall verifies'''
+    from app import downloader
+    hashes = _Hashes()
+    sources = lambda u: (lambda _m: {"urls": [u], "zip": False, "model_hash": None, "tos": False})
+    model = "tts_models/xx/ajtts-check/vits"
+    folder = downloader.download_model(model, sources=sources(url), hashes=hashes)
+    assert (folder / "model.bin").exists() and hashes.get(url), "first download not recorded"
+    downloader.download_model(model, sources=sources(url), hashes=hashes)
+    # Same file name, different bytes: must be refused against the recorded hash
+    hashes[tampered_url] = hashes[url]
+    try:
+        downloader.download_model(model, sources=sources(tampered_url), hashes=hashes)
+    except downloader.DownloadError:
+        return None
+    raise AssertionError("changed file accepted")
+
+def check_downloads() -> dict:
+    '''fetch(): dropped connection, resume from a .part, parallel ranges, sha256 mismatch;
+    download_model(): sha256 recorded on first install, enforced afterwards'''
+    import os
+    import hashlib
+    from app import downloader
+
+    payload = os.urandom(DOWNLOAD_CHECK_BYTES)
+    sha = hashlib.sha256(payload).hexdigest()
+    results = {}
+
+    def run(name, fn):
+        try:
+            results[name] = fn() or "ok"
+        except Exception as e:
+            results[name] = f"FAIL: {type(e).__name__}: {e}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        def dropped():
+            server, url, seen = _range_server(payload, cut_first=1024 * 1024)
+            try:
+                digest = downloader.fetch(url, tmp / "dropped.bin", sha, ranges=1)
+            finally:
+                server.shutdown()
+            assert digest == sha and (tmp / "dropped.bin").read_bytes() == payload, "corrupt file"
+            assert any(r and r.startswith("bytes=1048576-") for r in seen), f"no Range resume: {seen}"
+
+        def resumed():
+            part = tmp / "resumed.bin.part"
+            part.write_bytes(payload[:777777])
+            server, url, seen = _range_server(payload)
+            try:
+                digest = downloader.fetch(url, tmp / "resumed.bin", sha, ranges=1)
+            finally:
+                server.shutdown()
+            assert digest == sha and (tmp / "resumed.bin").read_bytes() == payload, "corrupt file"
+            assert seen == ["bytes=777777-"], f"expected one resumed request, saw {seen}"
+
+        def parallel():
+            saved = downloader.PARALLEL_MIN_BYTES
+            downloader.PARALLEL_MIN_BYTES = 0
+            server, url, seen = _range_server(payload, cut_first=100000)
+            try:
+                digest = downloader.fetch(url, tmp / "parallel.bin", sha, ranges=4)
+            finally:
+                downloader.PARALLEL_MIN_BYTES = saved
+                server.shutdown()
+            assert digest == sha and (tmp / "parallel.bin").read_bytes() == payload, "corrupt file"
+            assert len(seen) >= 5, f"expected 4 ranges + 1 retry, saw {seen}"
+
+        def mismatch():
+            server, url, _ = _range_server(payload)
+            try:
+                downloader.fetch(url, tmp / "bad.bin", "0" * 64, ranges=1)
+            except downloader.DownloadError:
+                assert not (tmp / "bad.bin").exists() and not (tmp / "bad.bin.part").exists(), \
+                    "corrupt download left behind"
+                return None
+            finally:
+                server.shutdown()
+            raise AssertionError("sha256 mismatch not detected")
+
+        def recorded():
+            server, url, _ = _range_server(payload)
+            other, other_url, _ = _range_server(payload[::-1])
+            saved = os.environ.get("HOME")
+            os.environ["HOME"] = str(tmp)
+            try:
+                return in_subprocess(_download_model_run, url, other_url)
+            finally:
+                if saved is None:
+                    os.environ.pop("HOME", None)
+                else:
+                    os.environ["HOME"] = saved
+                server.shutdown()
+                other.shutdown()
+
+        for name, fn in (("dropped", dropped), ("resumed", resumed), ("parallel", parallel),
+                         ("mismatch", mismatch), ("recorded", recorded)):
+            run(name, fn)
+    return results
+
+def cmd_downloads(args) -> int:
+    results = check_downloads()
+    print(json.dumps(results, indent=2))
+    return 1 if any(str(v).startswith("FAIL") for v in results.values()) else 0
+
+# Suite: per installed voice, comparable run to run
+SUITE_VERSION = 1
+SUITE_SIZES = {"short": 1, "medium": 3, "long": 10} # sentences per input
+REGRESSION_TOLERANCE = 0.10 # +10% over the baseline
+REGRESSION_FLOOR = {"_s": 0.005, "_ms": 0.5, "rtf": 0.005, "_mb": 5.0} # ignore noise below these
+NORMALIZE_SAMPLES = {
+    "en": ["The invoice total was $1,234.56 on 03/04/2024, up 12% from 2023.",
+           "Call 555-0199 before 5:30 pm; room 42B is on the 3rd floor."],
+    "es": ["El total fue de ₡12 500,50 el 3/4/2024, un 12 % más que en 2023.",
+           "Llame al 2222-3333 antes de las 5:30; la oficina 42 está en el 3.er piso."],
+}
+
+def installed_models() -> list[str]:
+    '''Model ids with local weights + config (assets or cache), as resolve_model sees them'''
+    import os
+    from app.model_index import get_model_index
+    from app.tts_engine import resolve_model
+
+    models = set()
+    for folder, entry in get_model_index().models().items():
+        if not (entry["config"] and entry["weights"]):
+            continue
+        model_id = os.path.basename(folder).replace("--", "/")
+        model_path, config_path = resolve_model(model_id)
+        if model_path and config_path:
+            models.add(model_id)
+    return sorted(models)
+
+def suite_inputs(lang: str) -> dict:
+    corpus = CORPORA[lang]
+    return {size: " ".join((corpus * n)[:n]) for size, n in SUITE_SIZES.items()}
+
+def _bench_voice(model_name: str, repeats: int) -> dict:
+    '''Runs in a fresh process: cold load, warm reload, RTF and time-to-first-audio per size'''
+    import os
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp: # store may still be open
+        # Empty phoneme store every run (and the user's one untouched): read at import time,
+        # and nothing has imported app.phoneme_cache yet in this fresh process
+        os.environ["AJTTS_PHONEME_CACHE"] = str(Path(tmp) / "phonemes.sqlite")
+        return _bench_voice_run(model_name, repeats)
+
+def _bench_voice_run(model_name: str, repeats: int) -> dict:
+    import gc
+    from app.tts_engine import AquaTTS
+
+    cold_s, engine = _timed(AquaTTS, model_name, audio_cache=False)
+    del engine
+    gc.collect()
+    warm_s, engine = _timed(AquaTTS, model_name, audio_cache=False) # files cached, libs imported
+    engine.warm_up()
+    sr = float(engine.sample_rate)
+
+    sizes = {}
+    for size, text in suite_inputs(_lang_of(model_name)).items():
+        rtf, ttfa_stream, ttfa_whole = [], [], []
+        for _ in range(repeats):
+            # Non-streaming: first audio = the whole utterance
+            dt, (wav, _) = _timed(engine.synthesize_to_pcm, text)
+            ttfa_whole.append(dt)
+            rtf.append(dt / (len(wav) / sr) if len(wav) else 0.0)
+            # Streaming: first sentence chunk
+            chunks = engine.iter_pcm_chunks(text)
+            dt, _ = _timed(next, chunks)
+            chunks.close()
+            ttfa_stream.append(dt)
+        sizes[size] = {
+            "chars": len(text),
+            "rtf": min(rtf),
+            "ttfa_stream_s": min(ttfa_stream),
+            "ttfa_whole_s": min(ttfa_whole),
+        }
+    return {
+        "info": engine.loaded_info,
+        "load_cold_s": cold_s,
+        "load_warm_s": warm_s,
+        "sizes": sizes,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def bench_normalization(lang: str, repeats: int = 50) -> dict:
+    '''repair_text and the language normalizer timed separately, ms per utterance'''
+    from app.tts_engine import repair_text, safe_normalize, sanitize_for_andword_bug
+    if lang == "es":
+        from app.normalize_es import normalize_es_numbers
+        normalize = lambda t: normalize_es_numbers(t, currency_default="CRC")
+    else:
+        from app.normalize_en import normalize_text_en
+        normalize = lambda t: sanitize_for_andword_bug(safe_normalize(normalize_text_en, t))
+
+    texts = CORPORA[lang] + NORMALIZE_SAMPLES[lang]
+    repaired = [repair_text(t) for t in texts]
+    repair_s, _ = _timed(lambda: [repair_text(t) for _ in range(repeats) for t in texts])
+    normalize_s, _ = _timed(lambda: [normalize(t) for _ in range(repeats) for t in repaired])
+    n = repeats * len(texts)
+    return {"repair_ms": repair_s * 1000.0 / n, "normalize_ms": normalize_s * 1000.0 / n}
+
+def run_suite(models=None, repeats: int = 3) -> dict:
+    import os
+    import platform
+    from app.parallel import available_cpus
+
+    os.environ.setdefault("HF_HUB_OFFLINE", "1") # local voices only
+    models = models or installed_models()
+    report = {
+        "version": SUITE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {"platform": platform.platform(), "python": platform.python_version(),
+                 "cpus": available_cpus()},
+        "normalization": {lang: bench_normalization(lang) for lang in CORPORA},
+        "models": {},
+    }
+    for m in models:
+        try:
+            report["models"][m] = in_subprocess(_bench_voice, m, repeats)
+        except Exception as e:
+            report["models"][m] = {"error": str(e)}
+        print(f"[bench] {m}: done", file=sys.stderr)
+    return report
+
+def _metrics(node, prefix=""):
+    '''Flatten numeric leaves: {"models/x/sizes/short/rtf": 0.12, ...}'''
+    if isinstance(node, dict):
+        for k, v in node.items():
+            yield from _metrics(v, f"{prefix}/{k}" if prefix else str(k))
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        yield prefix, float(node)
+
+def _floor(metric: str) -> float:
+    name = metric.rsplit("/", 1)[-1]
+    return next((f for suffix, f in REGRESSION_FLOOR.items() if name.endswith(suffix)), None)
+
+def compare_reports(current: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE) -> dict:
+    '''Timing/RTF/RSS metrics are lower-is-better; flag the ones more than tolerance worse'''
+    base = dict(_metrics({"models": baseline.get("models", {}),
+                          "normalization": baseline.get("normalization", {})}))
+    out = {"tolerance": tolerance, "regressions": [], "improvements": [], "missing": []}
+    for metric, value in _metrics({"models": current.get("models", {}),
+                                   "normalization": current.get("normalization", {})}):
+        floor = _floor(metric)
+        if floor is None:
+            continue # counts (chars, ...) are not performance
+        if metric not in base:
+            out["missing"].append(metric)
+            continue
+        old = base[metric]
+        change = (value - old) / old if old else 0.0
+        entry = {"metric": metric, "baseline": old, "current": value, "change": round(change, 4)}
+        if value > old * (1 + tolerance) and value - old > floor:
+            out["regressions"].append(entry)
+        elif value < old * (1 - tolerance) and old - value > floor:
+            out["improvements"].append(entry)
+    return out
+
+def cmd_run(args) -> int:
+    report = run_suite(args.models, repeats=args.repeats)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text)
+        print(f"Results written to {args.out}", file=sys.stderr)
+    else:
+        print(text)
+    if not args.baseline:
+        return 0
+    comparison = compare_reports(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+    print(json.dumps(comparison, indent=2), file=sys.stderr)
+    if comparison["regressions"]:
+        print(f"{len(comparison['regressions'])} regression(s) over {args.tolerance:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+def cmd_compare(args) -> int:
+    current = json.loads(Path(args.current).read_text())
+    baseline = json.loads(Path(args.baseline).read_text())
+    comparison = compare_reports(current, baseline, args.tolerance)
+    print(json.dumps(comparison, indent=2))
+    return 1 if comparison["regressions"] else 0
+
+# Startup / import time
+IMPORT_BUDGETS_MS = {
+    "app.tts_engine": 400,
+    "app.model_manager": 50,
+    "app.model_pool": 450,
+    "app.playback": 1500,
+    "app.gui": 2500,
+}
+# Must not be pulled in by merely importing the app (they load on first real use)
+FORBIDDEN_AT_IMPORT = ("torch", "TTS", "onnxruntime")
+
+def import_costs(module: str) -> dict:
+    '''Cumulative import time (ms) per module, measured with -X importtime in a fresh interpreter'''
+    import subprocess
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=str(Path(__file__).resolve().parent.parent),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"import {module} failed")
+    costs = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = [x.strip() for x in line.split(":", 1)[1].split("|")]
+            costs[name] = int(cumulative) / 1000.0
+        except ValueError:
+            continue # header
+    return costs
+
+def check_import_budgets(budgets: dict = None) -> dict:
+    budgets = budgets or IMPORT_BUDGETS_MS
+    report = {}
+    for module, budget in budgets.items():
+        costs = import_costs(module)
+        heaviest = sorted(((ms, n) for n, ms in costs.items() if "." not in n), reverse=True)[:8]
+        forbidden = sorted(n for n in costs if n.split(".")[0] in FORBIDDEN_AT_IMPORT and "." not in n)
+        ms = costs.get(module, 0.0)
+        report[module] = {
+            "ms": ms,
+            "budget_ms": budget,
+            "ok": ms <= budget and not forbidden,
+            "forbidden": forbidden,
+            "heaviest": {n: t for t, n in heaviest},
+        }
+    return report
+
+def cmd_imports(args) -> int:
+    budgets = dict(IMPORT_BUDGETS_MS)
+    for spec in args.budget or []:
+        name, _, ms = spec.partition("=")
+        budgets[name] = float(ms)
+    report = check_import_budgets(budgets)
+    print(json.dumps(report, indent=2))
+    failed = [m for m, r in report.items() if not r["ok"]]
+    if failed:
+        print(f"Import budget exceeded: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+def _espeak(lang: str):
+    from TTS.tts.utils.text.phonemizers import ESpeak
+    return ESpeak(language={"en": "en-us", "es": "es"}[lang])
+
+def cmd_phonemes(args) -> int:
+    results = {}
+    for lang in args.lang:
+        results[lang] = bench_phonemizer(_espeak(lang), CORPORA[lang], repeats=args.repeats)
+    print(json.dumps(results, indent=2))
+    return 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.benchmark")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("phonemes", help="espeak phonemization, uncached vs cached")
+    p.add_argument("--lang", nargs="+", default=["en", "es"], choices=sorted(CORPORA))
+    p.add_argument("--repeats", type=int, default=3)
+    p.set_defaults(func=cmd_phonemes)
+
+    p = sub.add_parser("batch", help="batched vs sequential inference throughput")
+    p.add_argument("--model", default="tts_models/en/ljspeech/vits")
+    p.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    p.add_argument("--scale", type=int, default=2, help="corpus repetitions")
+    p.add_argument("--repeats", type=int, default=2)
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("backends", help="PyTorch vs ONNX Runtime load time and latency")
+    p.add_argument("--model", default="tts_models/en/ljspeech/vits")
+    p.add_argument("--repeats", type=int, default=2)
+    p.set_defaults(func=cmd_backends)
+
+    p = sub.add_parser("quant", help="fp32 vs int8 dynamic quantization: RTF and RSS")
+    p.add_argument("--models", nargs="+", default=BUILTIN_VOICES)
+    p.set_defaults(func=cmd_quant)
+
+    p = sub.add_parser("cancel", help="CPU and wall time spent after cancelling a long synthesis")
+    p.add_argument("--model", default="tts_models/en/ljspeech/vits")
+    p.add_argument("--after", type=float, default=0.5, help="seconds before cancelling")
+    p.add_argument("--scale", type=int, default=4, help="corpus repetitions (text length)")
+    p.set_defaults(func=cmd_cancel)
+
+    p = sub.add_parser("preload", help="concurrent model preparation with a fake downloader; exit 1 on failure")
+    p.add_argument("--workers", type=int, default=2, help="max concurrent downloads")
+    p.set_defaults(func=cmd_preload)
+
+    p = sub.add_parser("downloads", help="resume/ranges/checksums against a local HTTP server; exit 1 on failure")
+    p.set_defaults(func=cmd_downloads)
+
+    p = sub.add_parser("run", help="suite: load time, RTF, time-to-first-audio, peak RSS per installed voice")
+    p.add_argument("--models", nargs="*", help="default: every installed voice")
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--out", help="write results JSON here (default: stdout)")
+    p.add_argument("--baseline", help="results JSON to compare against; exit 1 on regressions")
+    p.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("compare", help="compare two results JSON files")
+    p.add_argument("current")
+    p.add_argument("baseline")
+    p.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    p.set_defaults(func=cmd_compare)
+
+    p = sub.add_parser("imports", help="per-module import cost; exit 1 if over budget")
+    p.add_argument("--budget", nargs="*", metavar="MODULE=MS", help="override a module budget")
+    p.set_defaults(func=cmd_imports)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,10 @@ DEFAULT_CONFIG = {
     "waifu_language": "es",
     "voice_model": "tts_models/es/mai/tacotron2-DDC",
     "hotkey": "ctrl+alt+h",
+    # Engine threading (None: torch defaults); AJTTS_INTRA_THREADS etc. still win
+    "intra_op_threads": None,
+    "interop_threads": None,
+    "cpu_affinity": None, # e.g. "0-3"
 }
 
 def load_config():
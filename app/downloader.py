@@ -0,0 +1,382 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Model downloads: HTTP Range resume, parallel range fetches for big files, sha256
+# computed while streaming, and an atomic install into the cache dir (staged under
+# CACHE_DIR/.staging). Coqui's catalog has no usable checksums, so each file's sha256 is
+# recorded on its first download (ModelCatalog) and verified on every later one;
+# AJTTS_DOWNLOAD_REQUIRE_HASH=1 refuses files without a recorded hash instead.
+# Plain urllib so it can be pointed at any HTTP server (e.g. a local test server).
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import zipfile
+import threading
+import urllib.request
+import urllib.error
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from app.model_manager import BASE_DIR, normalize_model_name
+
+logger = logging.getLogger("ajtts")
+
+STAGING_DIR = BASE_DIR / ".staging" # hidden: ignored by the model index
+CHUNK_BYTES = 256 * 1024
+PARALLEL_MIN_BYTES = int(os.environ.get("AJTTS_DOWNLOAD_PARALLEL_MIN_MB", "32")) * 1024 * 1024
+PARALLEL_RANGES = int(os.environ.get("AJTTS_DOWNLOAD_RANGES", "4"))
+RETRIES = int(os.environ.get("AJTTS_DOWNLOAD_RETRIES", "5"))
+TIMEOUT_S = 30
+PROGRESS_INTERVAL_S = 0.1
+STATE_SAVE_BYTES = 4 * 1024 * 1024 # persist parallel progress every few MB
+REQUIRE_HASH = os.environ.get("AJTTS_DOWNLOAD_REQUIRE_HASH", "0") == "1"
+
+class DownloadError(Exception):
+    pass
+
+class UnsupportedSource(DownloadError):
+    '''Catalog entry we cannot fetch ourselves (e.g. fairseq); use Coqui's ModelManager'''
+
+class _Progress:
+    '''Thread-safe byte counter; calls progress(done, total) at most every PROGRESS_INTERVAL_S'''
+    def __init__(self, progress, total, done=0):
+        self.progress = progress
+        self.total = total
+        self.done = done
+        self._lock = threading.Lock()
+        self._last = 0.0
+
+    def add(self, n: int, force: bool = False):
+        with self._lock:
+            self.done += n
+            now = time.monotonic()
+            if not self.progress or (not force and now - self._last < PROGRESS_INTERVAL_S):
+                return
+            self._last = now
+            done, total = self.done, self.total
+        self.progress(done, total)
+
+def _request(url: str, method: str = "GET", headers: dict = None):
+    req = urllib.request.Request(url, method=method, headers={"User-Agent": "ajtts", **(headers or {})})
+    return urllib.request.urlopen(req, timeout=TIMEOUT_S)
+
+def probe(url: str) -> dict:
+    '''size / etag / range support of a remote file (HEAD, following redirects)'''
+    try:
+        with _request(url, "HEAD") as r:
+            size = r.headers.get("Content-Length")
+            return {
+                "url": r.geturl(), # final URL after redirects
+                "size": int(size) if size else None,
+                "etag": r.headers.get("ETag") or r.headers.get("Last-Modified"),
+                "ranges": r.headers.get("Accept-Ranges", "").lower() == "bytes",
+            }
+    except urllib.error.HTTPError as e:
+        if e.code not in (403, 405, 501): # some servers refuse HEAD
+            raise
+    return {"url": url, "size": None, "etag": None, "ranges": False}
+
+def _hash_file(path: Path, hasher=None):
+    hasher = hasher or hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher
+
+def _with_retries(fn, what: str):
+    for attempt in range(RETRIES + 1):
+        try:
+            return fn()
+        except (urllib.error.URLError, OSError, DownloadError) as e:
+            if isinstance(e, urllib.error.HTTPError) and 400 <= e.code < 500 and e.code != 416:
+                raise
+            if attempt == RETRIES:
+                raise DownloadError(f"{what}: {e}") from e
+            logger.warning("Download retry %d/%d (%s): %s", attempt + 1, RETRIES, what, e)
+            time.sleep(min(2 ** attempt, 10) * 0.5)
+
+# Single stream (resumable, hashed while streaming)
+def _fetch_sequential(info: dict, part: Path, meter: _Progress, algorithm: str):
+    url, etag = info["url"], info["etag"]
+    state = {"offset": 0, "hasher": hashlib.new(algorithm)}
+
+    if part.exists():
+        state["offset"] = part.stat().st_size
+        _hash_file(part, state["hasher"])
+        meter.add(state["offset"])
+
+    def attempt():
+        headers = {}
+        if state["offset"]:
+            headers["Range"] = f"bytes={state['offset']}-"
+            if etag:
+                headers["If-Range"] = etag
+        try:
+            r = _request(url, headers=headers)
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and info["size"] is not None and state["offset"] >= info["size"]:
+                return # already complete
+            raise
+        with r:
+            if state["offset"] and r.status != 206:
+                # Remote changed (or no range support): start over
+                meter.add(-state["offset"])
+                state["offset"], state["hasher"] = 0, hashlib.new(algorithm)
+            with open(part, "ab" if state["offset"] else "wb") as f:
+                while True:
+                    block = r.read(CHUNK_BYTES)
+                    if not block:
+                        break
+                    f.write(block)
+                    state["hasher"].update(block)
+                    state["offset"] += len(block)
+                    meter.add(len(block))
+        if info["size"] is not None and state["offset"] < info["size"]:
+            raise DownloadError(f"connection closed at {state['offset']}/{info['size']} bytes")
+
+    _with_retries(attempt, url)
+    return state["hasher"].hexdigest()
+
+# Parallel ranges (resumable through a small JSON state file next to the .part)
+def _fetch_parallel(info: dict, part: Path, meter: _Progress, ranges: int, algorithm: str):
+    url, size, etag = info["url"], info["size"], info["etag"]
+    state_path = part.with_name(part.name + ".json")
+    state = None
+    if part.exists() and state_path.exists():
+        try:
+            state = json.loads(state_path.read_text())
+        except ValueError:
+            state = None
+        if state and (state.get("size") != size or state.get("etag") != etag):
+            state = None
+    if state is None:
+        step = -(-size // ranges)
+        state = {"size": size, "etag": etag,
+                 "ranges": [[s, min(s + step, size), s] for s in range(0, size, step)]} # start, end, next
+        with open(part, "wb") as f:
+            f.truncate(size)
+    meter.add(sum(r[2] - r[0] for r in state["ranges"]))
+
+    lock = threading.Lock()
+    unsaved = [0]
+
+    def save_state(force=False):
+        with lock:
+            if not force and unsaved[0] < STATE_SAVE_BYTES:
+                return
+            unsaved[0] = 0
+            tmp = state_path.with_name(state_path.name + ".tmp")
+            tmp.write_text(json.dumps(state))
+            os.replace(tmp, state_path)
+
+    def fetch_range(rng):
+        def attempt():
+            start, end, nxt = rng
+            if nxt >= end:
+                return
+            headers = {"Range": f"bytes={nxt}-{end - 1}"}
+            if etag:
+                headers["If-Range"] = etag
+            with _request(url, headers=headers) as r:
+                if r.status != 206:
+                    raise DownloadError("server ignored the Range request (file changed?)")
+                fd = os.open(part, os.O_WRONLY)
+                try:
+                    while rng[2] < end:
+                        block = r.read(min(CHUNK_BYTES, end - rng[2]))
+                        if not block:
+                            break
+                        os.pwrite(fd, block, rng[2])
+                        with lock:
+                            rng[2] += len(block)
+                            unsaved[0] += len(block)
+                        meter.add(len(block))
+                        save_state()
+                finally:
+                    os.close(fd)
+            if rng[2] < end:
+                raise DownloadError(f"range closed at {rng[2]}/{end} bytes")
+        _with_retries(attempt, f"{url} [{rng[0]}-{rng[1]}]")
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(state["ranges"]), thread_name_prefix="ajtts-dl") as pool:
+            for f in [pool.submit(fetch_range, rng) for rng in state["ranges"]]:
+                f.result()
+    finally:
+        save_state(force=True)
+
+    # Ranges arrive out of order: hash in one pass at the end
+    digest = _hash_file(part, hashlib.new(algorithm)).hexdigest()
+    state_path.unlink(missing_ok=True)
+    return digest
+
+def fetch(url: str, dest, checksum: str = None, progress=None, ranges: int = None,
+          algorithm: str = "sha256") -> str:
+    '''Download url to dest (atomically). Resumes from dest.part; returns the hex digest
+    (hashlib algorithm), checked against checksum when given'''
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    part = dest.with_name(dest.name + ".part")
+    info = _with_retries(lambda: probe(url), url)
+    meter = _Progress(progress, info["size"])
+
+    ranges = ranges or PARALLEL_RANGES
+    if info["ranges"] and info["size"] and info["size"] >= PARALLEL_MIN_BYTES and ranges > 1:
+        digest = _fetch_parallel(info, part, meter, ranges, algorithm)
+    else:
+        part.with_name(part.name + ".json").unlink(missing_ok=True)
+        digest = _fetch_sequential(info, part, meter, algorithm)
+    meter.add(0, force=True)
+
+    if info["size"] is not None and part.stat().st_size != info["size"]:
+        raise DownloadError(f"{url}: size {part.stat().st_size} != {info['size']}")
+    if checksum and digest != checksum.lower():
+        part.unlink(missing_ok=True) # corrupt: do not resume from it
+        raise DownloadError(f"{url}: {algorithm} mismatch ({digest} != {checksum})")
+    os.replace(part, dest)
+    return digest
+
+# Coqui ModelManager internals (private API, TTS 0.22). Only these two functions touch
+# them; if they change, downloads fall back to Coqui's own ModelManager.download_model
+def coqui_model_item(model_id: str) -> dict:
+    '''Catalog entry (.models.json) of model_id'''
+    from app.model_manager import get_model_manager
+    try:
+        item = get_model_manager()._set_model_item(model_id)[0]
+    except (AttributeError, TypeError, IndexError) as e:
+        raise UnsupportedSource(f"{model_id}: unexpected Coqui ModelManager ({e})") from e
+    if not isinstance(item, dict):
+        raise UnsupportedSource(f"{model_id}: unexpected Coqui catalog entry")
+    return item
+
+def coqui_update_paths(folder: Path):
+    '''Point speaker/language files in config.json at folder (Coqui does the same)'''
+    from app.model_manager import get_model_manager
+    manager = get_model_manager()
+    if not hasattr(manager, "_update_paths"):
+        logger.warning("Coqui ModelManager has no _update_paths: %s keeps its config paths", folder.name)
+        return
+    manager._update_paths(str(folder), str(folder / "config.json"))
+
+# Coqui models
+def model_sources(model_id: str) -> dict:
+    '''{"urls": [...], "zip": bool, "model_hash": str|None, "tos": bool} from the Coqui catalog.
+    model_hash is only a version marker (written to hash.md5 like Coqui does), not a checksum'''
+    item = coqui_model_item(model_id)
+    if "github_rls_url" in item:
+        urls, is_zip = [item["github_rls_url"]], True
+    elif "hf_url" in item:
+        urls, is_zip = list(item["hf_url"]), False
+    else:
+        raise UnsupportedSource(model_id)
+    return {"urls": urls, "zip": is_zip, "model_hash": item.get("model_hash"),
+            "tos": "tos_required" in item}
+
+def _extract_flat(archive: Path, folder: Path):
+    '''Coqui release zips hold one sub-folder; install its files flat, like ModelManager does'''
+    with zipfile.ZipFile(archive) as z:
+        bad = z.testzip()
+        if bad:
+            raise DownloadError(f"{archive.name}: corrupt member {bad}")
+        for member in z.infolist():
+            if member.is_dir():
+                continue
+            name = os.path.basename(member.filename)
+            if not name:
+                continue
+            with z.open(member) as src, open(folder / name, "wb") as dst:
+                shutil.copyfileobj(src, dst, CHUNK_BYTES)
+
+def _update_config_paths(folder: Path):
+    '''Point speaker/language files in config.json at the install folder (Coqui does the same)'''
+    try:
+        coqui_update_paths(folder)
+    except Exception as e:
+        logger.warning("Could not update config paths for %s: %s", folder.name, e)
+
+def download_model(model_id: str, progress=None, log=None, sources=None, hashes=None) -> Path:
+    '''Fetch, verify and atomically install a model into BASE_DIR; returns the install folder.
+    sources(model_id) -> model_sources() dict; hashes: file_hash(url) / record_file_hash(url, sha256)
+    (default: the ModelCatalog). Both injectable for checks / other catalogs'''
+    log = log or (lambda *_: None)
+    if hashes is None:
+        from app.model_catalog import get_model_catalog
+        hashes = get_model_catalog()
+    src = (sources or model_sources)(model_id)
+    name = normalize_model_name(model_id)
+    work = STAGING_DIR / name # .part files live here across attempts (resume)
+    staged = STAGING_DIR / f"{name}.install"
+    final = BASE_DIR / name
+    work.mkdir(parents=True, exist_ok=True)
+    shutil.rmtree(staged, ignore_errors=True)
+    staged.mkdir(parents=True)
+
+    # Byte progress across all files of the model
+    totals = {}
+    def file_progress(i):
+        def report(done, total):
+            totals[i] = (done, total or 0)
+            if progress:
+                progress(sum(d for d, _ in totals.values()),
+                         sum(t for _, t in totals.values()))
+        return report
+
+    digests, verified = {}, {}
+    for i, url in enumerate(src["urls"]):
+        fname = os.path.basename(url.split("?", 1)[0]) or f"file{i}"
+        expected = hashes.file_hash(url)
+        if expected is None and REQUIRE_HASH:
+            raise DownloadError(f"{fname}: no recorded sha256 (AJTTS_DOWNLOAD_REQUIRE_HASH=1)")
+        log(f"Downloading {fname}")
+        target = work / fname
+        if target.exists():
+            # Finished in an earlier attempt
+            digests[url] = _hash_file(target).hexdigest()
+            if expected and digests[url] != expected:
+                target.unlink()
+        if not target.exists():
+            digests[url] = fetch(url, target, expected, progress=file_progress(i))
+        verified[fname] = expected is not None
+        if expected is None:
+            log(f"First download of {fname}: recording its sha256")
+        if src["zip"]:
+            log(f"Extracting {fname}")
+            _extract_flat(target, staged)
+        else:
+            shutil.copyfile(target, staged / fname)
+
+    if src.get("model_hash"):
+        (staged / "hash.md5").write_text(src["model_hash"])
+    if src.get("tos"):
+        (staged / "tos_agreed.txt").write_text("I have read, understood and agreed to the Terms and Conditions.")
+    if (staged / "config.json").exists():
+        _update_config_paths(staged)
+        # _update_paths writes the staging path; rewrite it to the final folder
+        cfg = staged / "config.json"
+        cfg.write_text(cfg.read_text().replace(str(staged), str(final)))
+    (staged / "ajtts_download.json").write_text(json.dumps(
+        {"model": model_id, "sha256": digests, "verified": verified}))
+
+    # Atomic install: the model folder appears complete or not at all
+    if final.exists():
+        old = STAGING_DIR / f"{name}.old"
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(final, old)
+        os.replace(staged, final)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(staged, final)
+    shutil.rmtree(work, ignore_errors=True)
+    # Only a complete install becomes the reference for later downloads
+    for url, digest in digests.items():
+        hashes.record_file_hash(url, digest)
+
+    from app.model_index import get_model_index
+    get_model_index().invalidate(final)
+    log(f"Installed: {model_id}")
+    return final
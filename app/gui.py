@@ -49,6 +49,12 @@ BUILTIN_MODELS = [
     "tts_models/es/css10/vits",
     "tts_models/en/ljspeech/vits",
 ]
+DEFAULT_MODEL = "tts_models/en/ljspeech/vits"
+
+# Play sentence by sentence while the rest is still being synthesized
+STREAMING_SYNTHESIS = True
+# Wait this long after the last voice change before loading it
+MODEL_SWITCH_DEBOUNCE_MS = 300
 
 KOFI_URL = "https://ko-fi.com/inlcreations"
 
@@ -73,11 +79,14 @@ class MessageManager:
 
 class PreloadWorker(QObject):
     progress = Signal(str)
+    model_ready = Signal(str, bool) # model id, ok; as soon as each one is prepared
     finished = Signal(bool)
 
-    def __init__(self, models):
+    def __init__(self, models, first=None, downloader=None):
         super().__init__()
-        self.models = models
+        # The default voice goes first so it gets a download slot right away
+        self.models = sorted(models, key=lambda m: m != first)
+        self.downloader = downloader
 
     def run(self):
         from app.tts_engine import ensure_preinstalled_models
@@ -85,37 +94,57 @@ class PreloadWorker(QObject):
         def _log(msg):
             self.progress.emit(str(msg))
         try:
-            ok = ensure_preinstalled_models(self.models, log=_log)
+            ok = ensure_preinstalled_models(
+                self.models, log=_log, downloader=self.downloader,
+                on_ready=lambda m, ok: self.model_ready.emit(m, ok)
+            )
             self.finished.emit(bool(ok))
         except Exception as e:
             self.progress.emit(f"Preload error: {e}")
             self.finished.emit(False)
 
-class SpeakWorker(QObject):
+class ModelLoader(QObject):
+    '''Lives in its own thread: loads (pool) and warms engines, never on the GUI thread'''
+    request = Signal(str, int) # model id, generation (emit from the GUI thread)
     progress = Signal(str)
-    finished = Signal(bool)
-    ready_wav = Signal(str)
+    loaded = Signal(int, str, object) # generation, model id, engine
+    failed = Signal(int, str, str) # generation, model id, error
 
-    def __init__(self, tts_engine, text):
+    def __init__(self, model_pool):
         super().__init__()
-        self.tts_engine = tts_engine
-        self.text = text
+        self.model_pool = model_pool
+        self.latest = 0 # newest generation asked for; older queued loads are skipped
+        self.request.connect(self._load)
 
-    def run(self):
+    def _load(self, model_name: str, generation: int):
+        from app.tts_engine import WARMUP_RUNS, debug_model_status
+
+        if generation < self.latest:
+            return
         try:
-            self.progress.emit("Synthesizing...")
-            wav_path = self.tts_engine.synthesize_to_wav(self.text)
-            self.ready_wav.emit(wav_path)
-            self.finished.emit(True)
+            print(debug_model_status(model_name))
+            if not self.model_pool.contains(model_name):
+                self.progress.emit(f"Loading {model_name}...")
+            engine = self.model_pool.get(model_name)
+            # Pool hits are already warm
+            if WARMUP_RUNS > 0 and engine.warmup_stats is None and generation >= self.latest:
+                self.progress.emit(f"Warming up {model_name}...")
+                stats = engine.warm_up()
+                print(f"[INFO] Warm-up {model_name}: {stats}")
+            self.loaded.emit(generation, model_name, engine)
         except Exception as e:
-            self.progress.emit(f"Error: {e}")
-            self.finished.emit(False)
+            self.failed.emit(generation, model_name, str(e))
 
 class AquaJupiterGUI(QMainWindow):
     def __init__(self):
         super().__init__()
 
+        from PySide6.QtCore import QTimer
         from app.playback import AudioController
+        from app.model_pool import ModelPool
+        from app.threads import ThreadConfig
+        from app.synthesis_service import SpeechService
+        from app import tracing
 
         BTN_W, BTN_H = 140, 36
         DIAL_SIZE = 72
@@ -128,8 +157,46 @@ class AquaJupiterGUI(QMainWindow):
 
         self.speaking = False
         self.last_text = None
+        self.tts_engine = None
+        self._voices_ready = 0
 
         self.audio = AudioController(self)
+        # Threading from user_data/config.json (intra_op_threads, ...), AJTTS_* env on top
+        self.model_pool = ModelPool(threads=ThreadConfig.load())
+
+        # One persistent synthesis thread fed by a work queue
+        self._speech_id = 0 # request whose audio is currently being fed to the stream
+        self.speech_thread = QThread(self)
+        self.speech = SpeechService()
+        self.speech.moveToThread(self.speech_thread)
+        self.speech_thread.started.connect(self.speech.run)
+        self.speech.progress.connect(lambda m: self.msg.show(m))
+        self.speech.started.connect(self._on_speech_started)
+        self.speech.chunk_pcm.connect(self._on_speech_chunk)
+        self.speech.idle.connect(self.audio.end_stream)
+        self.speech_thread.start()
+
+        # AJTTS_TRACE: per-stage breakdown of each request once its audio reaches the device
+        self.trace_bridge = None
+        if tracing.ENABLED:
+            self.trace_bridge = tracing.qt_bridge(self)
+            self.trace_bridge.event.connect(self._on_trace_event)
+
+        # Model loads happen in the background; the current engine keeps speaking until
+        # the new one is loaded and warm. Quick combo scrolling only loads the last pick
+        self._load_generation = 0
+        self.loader_thread = QThread(self)
+        self.loader = ModelLoader(self.model_pool)
+        self.loader.moveToThread(self.loader_thread)
+        self.loader.progress.connect(lambda m: self.msg.show(m))
+        self.loader.loaded.connect(self._on_model_loaded)
+        self.loader.failed.connect(self._on_model_failed)
+        self.loader_thread.start()
+        self._load_timer = QTimer(self)
+        self._load_timer.setSingleShot(True)
+        self._load_timer.setInterval(MODEL_SWITCH_DEBOUNCE_MS)
+        self._load_timer.timeout.connect(self._request_model_load)
+        self._pending_model = None
 
         # Playback Status
         self.audio.started.connect(lambda p: (setattr(self, "speaking", True), self.msg.show("Speaking...")))
@@ -184,7 +251,7 @@ class AquaJupiterGUI(QMainWindow):
 
         self.btn_stop = QPushButton("Stop")
         self.btn_stop.setFixedSize(BTN_W, BTN_H)
-        self.btn_stop.clicked.connect(self.audio.stop)
+        self.btn_stop.clicked.connect(self.stop_speaking)
 
         # Repeat Button
         repeat_button = QPushButton("Repeat")
@@ -271,11 +338,12 @@ class AquaJupiterGUI(QMainWindow):
         bottom_bar.addWidget(self.status_box, stretch=3)
 
         self.preload_thread = QThread(self)
-        self.preload_worker = PreloadWorker(BUILTIN_MODELS)
+        self.preload_worker = PreloadWorker(BUILTIN_MODELS, first=DEFAULT_MODEL)
         self.preload_worker.moveToThread(self.preload_thread)
 
         self.preload_thread.started.connect(self.preload_worker.run)
         self.preload_worker.progress.connect(self.msg.show)
+        self.preload_worker.model_ready.connect(self._on_model_ready)
         self.preload_worker.finished.connect(lambda ok: self.msg.show("Voices ready." if ok else "Some voices could not be prepared."))
         self.preload_worker.finished.connect(self._on_preload_finished)
 
@@ -302,7 +370,7 @@ class AquaJupiterGUI(QMainWindow):
 
         # Default English
         for i in range(self.voice_combo.count()):
-            if self.voice_combo.itemData(i) == "tts_models/en/ljspeech/vits":
+            if self.voice_combo.itemData(i) == DEFAULT_MODEL:
                 self.voice_combo.setCurrentIndex(i)
                 break
 
@@ -333,74 +401,96 @@ class AquaJupiterGUI(QMainWindow):
         self.move(window_geometry.topLeft())
     #----------------center-----------------
 
-    def _on_preload_finished(self, ok: bool):
-        idx = self.voice_combo.findData("tts_models/en/ljspeech/vits")
-        if idx != -1:
-            self.voice_combo.setCurrentIndex(idx)
+    def _on_model_ready(self, model_id: str, ok: bool):
+        if ok:
+            self._voices_ready += 1
+        self.msg.show(f"{'Ready' if ok else 'Failed'}: {model_id} ({self._voices_ready}/{len(BUILTIN_MODELS)})")
 
-        self.set_active_model(self.voice_combo.currentData())
+        # Speak as soon as the default voice is there, the others keep preparing
+        if ok and model_id == DEFAULT_MODEL and not self.tts_engine:
+            idx = self.voice_combo.findData(DEFAULT_MODEL)
+            if idx != -1:
+                self.voice_combo.setCurrentIndex(idx)
+            self.set_active_model(self.voice_combo.currentData())
 
-        if hasattr(self, "speak_btn"):
-            self.speak_btn.setEnabled(True)
+    def _on_preload_finished(self, ok: bool):
+        if not self.tts_engine and not self._load_generation:
+            self.set_active_model(self.voice_combo.currentData())
+
+    def speak_async(self, text: str, priority: int = None, prepare: bool = False, replace_key: str = None):
+        '''Queue text for the active voice. Overlapping requests wait their turn'''
+        from app.synthesis_service import INTERACTIVE
 
-    def speak_async(self, text: str):
         if not text or not self.tts_engine:
             return
-        
-        # No Overlaps
-        if self.speaking:
-            self.msg.show("Already speaking...")
-            return
-        
-        # A new thread for every new speech
-        thread = QThread(self)
-        worker = SpeakWorker(self.tts_engine, text)
-        worker.moveToThread(thread)
-
-        # Save refs and flags
-        self.speak_thread = thread
-        self.speak_worker = worker
-
-        # Signals
-        thread.started.connect(worker.run)
-        worker.progress.connect(self.msg.show)
-
-        worker.ready_wav.connect(lambda path: self.audio.play(path))
-
-        # Disable btn while speaking
-        if hasattr(self, "speak_btn"):
-            worker.progress.connect(lambda _=None: self.speak_btn.setEnabled(False))
-            worker.finished.connect(lambda _=None: self.speak_btn.setEnabled(True))
-
-        # Cleaning
-        
-        worker.finished.connect(thread.quit)
-        worker.finished.connect(worker.deleteLater)
-        thread.finished.connect(thread.deleteLater)
-
-        thread.start()
+        self.speech.submit(text, self.tts_engine, INTERACTIVE if priority is None else priority,
+                           prepare=prepare, streaming=STREAMING_SYNTHESIS, replace_key=replace_key)
+
+    def _on_speech_started(self, req_id: int, text: str, sample_rate: int):
+        self._speech_id = req_id
+        self.last_text = text
+        if not self.audio.continue_stream(sample_rate):
+            self.audio.begin_stream(sample_rate)
+
+    def _on_speech_chunk(self, req_id: int, samples, sample_rate: int):
+        # Late chunks of a stopped request never reach the next one's stream
+        if req_id == self._speech_id:
+            self.audio.feed_pcm(samples, sample_rate, request_id=req_id)
+
+    def _on_trace_event(self, event: dict):
+        from app import tracing
+
+        if event["name"] == "audio.first_write":
+            stages = tracing.stage_summary(event["request"])
+            print(f"[trace] request {event['request']}: " +
+                  ", ".join(f"{k} {v:.1f}ms" for k, v in stages.items()))
+
+    def stop_speaking(self):
+        '''Stop playback, drop queued requests and abort the synthesis in progress'''
+        self.speech.cancel_all()
+        self._speech_id = 0
+        self.audio.stop()
 
     def set_active_model(self, model_name: str):
+        '''Switch voice without blocking: debounced background load, then swap'''
         if not model_name:
             return
-        try:
-            from app.tts_engine import AquaTTS, debug_model_status
-            from app.tts_engine import debug_model_status
-            self.msg.show(debug_model_status(model_name))
-            self.tts_engine = AquaTTS(model_name)
-            info = getattr(self.tts_engine, "loaded_info", model_name)
-            self.msg.show(f"Model selected: {info}")
-            print(f"[INFO] Active model set to: {info}")
-        except Exception as e:
-            self.msg.show(f"Error loading model: {e}")
-            print(f"[ERROR] {e}")
+        self._pending_model = model_name
+        if self.tts_engine is None:
+            self._request_model_load() # nothing to keep speaking with: no need to wait
+        else:
+            self._load_timer.start()
 
-    def speak_from_clipboard(self):
+    def _request_model_load(self):
+        self._load_timer.stop()
+        model_name, self._pending_model = self._pending_model, None
+        if not model_name:
+            return
+        # Any load still running for an earlier pick is now stale
+        self._load_generation += 1
+        self.loader.latest = self._load_generation
+        if self.tts_engine is not None and self.tts_engine.model_name == model_name:
+            return
+        self.loader.request.emit(model_name, self._load_generation)
+
+    def _on_model_loaded(self, generation: int, model_name: str, engine):
+        if generation != self._load_generation:
+            return # a newer voice was picked meanwhile
+        # Requests already queued keep the engine they were submitted with
+        self.tts_engine = engine
+        info = getattr(engine, "loaded_info", model_name)
+        self.msg.show(f"Model selected: {info}")
+        print(f"[INFO] Active model set to: {info} | pool: {self.model_pool.stats()}")
+        if hasattr(self, "speak_btn"):
+            self.speak_btn.setEnabled(True)
 
-        from app.tts_engine import repair_text, safe_normalize, sanitize_for_andword_bug
-        from app.normalize_es import normalize_es_numbers
-        from app.normalize_en import normalize_text_en
+    def _on_model_failed(self, generation: int, model_name: str, error: str):
+        if generation != self._load_generation:
+            return
+        self.msg.show(f"Error loading model: {error}")
+        print(f"[ERROR] {error}")
 
+    def speak_from_clipboard(self):
         if not getattr(self, "tts_engine", None):
             self.msg.show("No model selected.")
             return
@@ -409,24 +499,9 @@ class AquaJupiterGUI(QMainWindow):
         mime = clipboard.mimeData()
         
         if mime.hasText():
-            raw_text = mime.text()
-            fixed_text = repair_text(raw_text)
-
-            try:
-                model_name = str(getattr(self.tts_engine, "model_name", "")).lower()
-                
-                if model_name.startswith("tts_models/es/"):
-                    fixed_text = normalize_es_numbers(fixed_text, currency_default="CRC")
-
-                elif model_name.startswith("tts_models/en/"):
-                    fixed_text = safe_normalize(normalize_text_en, fixed_text)
-                    fixed_text = sanitize_for_andword_bug(fixed_text)
-
-            except Exception as e:
-                print(f"[normalizer warning] {e}")
-
-            self.speak_async(fixed_text)
-            self.last_text = fixed_text
+            # Repair/normalization run on the synthesis thread; a newer clipboard
+            # request replaces one that has not started yet
+            self.speak_async(mime.text(), prepare=True, replace_key="clipboard")
         elif self.tts_engine.last_text:
             self.speak_async(self.tts_engine.last_text)
         else:
@@ -458,6 +533,7 @@ class AquaJupiterGUI(QMainWindow):
             self.processing_dialog.close()
 
     def on_model_deleted(self, model_name):
+        self.model_pool.evict(model_name)
         if self.tts_engine and self.tts_engine.model_name == model_name:
             self.tts_engine = None
             self.status_box.setText("Model deleted. No model selected.")
@@ -487,7 +563,10 @@ class AquaJupiterGUI(QMainWindow):
         except Exception:
             pass
 
-        for name in ("speak_thread", "proc_thread", "preload_thread"):
+        if hasattr(self, "speech"):
+            self.speech.shutdown()
+
+        for name in ("speech_thread", "proc_thread", "preload_thread", "loader_thread"):
             th = getattr(self, name, None)
             try:
                 if th and hasattr(th, "isRunning") and th.isRunning():
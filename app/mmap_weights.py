@@ -0,0 +1,132 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Zero-copy model weights: checkpoints rewritten as safetensors and mapped straight
+# into the model's parameters. The file is never written, so pages that are not
+# modified stay shared (page cache) between every process / pool entry using the voice.
+
+import os
+import json
+import mmap
+import struct
+import warnings
+from pathlib import Path
+
+SAFETENSORS_FILENAME = "model.safetensors"
+
+_DTYPES = {
+    "F64": "float64", "F32": "float32", "F16": "float16", "BF16": "bfloat16",
+    "I64": "int64", "I32": "int32", "I16": "int16", "I8": "int8", "U8": "uint8", "BOOL": "bool",
+}
+
+def find_safetensors(config_path) -> Path | None:
+    if not config_path:
+        return None
+    p = Path(config_path).parent / SAFETENSORS_FILENAME
+    return p if p.exists() else None
+
+def _stamp(model_path) -> dict:
+    st = Path(model_path).stat()
+    return {"source": Path(model_path).name, "source_size": str(st.st_size),
+            "source_mtime": str(int(st.st_mtime))}
+
+def is_fresh(st_path, model_path) -> bool:
+    '''True if st_path was converted from the checkpoint currently on disk'''
+    try:
+        meta = read_header(st_path).get("__metadata__", {})
+    except (OSError, ValueError):
+        return False
+    return all(meta.get(k) == v for k, v in _stamp(model_path).items())
+
+def convert_to_safetensors(model_name: str, log=None) -> Path:
+    '''Rewrite the resolved .pth checkpoint of model_name as model.safetensors'''
+    from safetensors.torch import save_file
+    from app.tts_engine import resolve_model, torch_tts
+
+    log = log or (lambda *_: None)
+    model_path, config_path = resolve_model(model_name)
+    if not (model_path and config_path) or Path(model_path).suffix not in (".pth", ".pt"):
+        raise FileNotFoundError(f"No local PyTorch checkpoint for {model_name}")
+
+    model = torch_tts(model_path, config_path).synthesizer.tts_model
+    tensors, aliases, seen = {}, {}, {}
+    for name, t in model.state_dict().items():
+        # safetensors refuses shared storage: keep the first, alias the rest
+        key = (t.untyped_storage().data_ptr(), t.storage_offset(), tuple(t.shape), t.dtype)
+        if t.numel() and key in seen:
+            aliases[name] = seen[key]
+            continue
+        seen[key] = name
+        tensors[name] = t.detach().contiguous()
+
+    out = Path(config_path).parent / SAFETENSORS_FILENAME
+    tmp = out.with_name(out.name + ".tmp")
+    meta = dict(_stamp(model_path), aliases=json.dumps(aliases), format="pt")
+    log(f"Converting {model_path.name} -> {out}")
+    save_file(tensors, str(tmp), metadata=meta)
+    os.replace(tmp, out)
+    return out
+
+def read_header(path) -> dict:
+    with open(path, "rb") as f:
+        (n,) = struct.unpack("<Q", f.read(8))
+        return json.loads(f.read(n))
+
+def mmap_state_dict(path) -> dict:
+    '''name -> tensor backed directly by the file mapping (no read, no unpickle, no copy)'''
+    import torch
+
+    header = read_header(path)
+    meta = header.pop("__metadata__", {}) or {}
+    with open(path, "rb") as f:
+        # Copy-on-write mapping: the file is never modified, untouched pages stay shared
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    (n,) = struct.unpack("<Q", mm[:8])
+    base = 8 + n
+
+    state = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for name, info in header.items():
+            dtype = getattr(torch, _DTYPES[info["dtype"]])
+            begin, end = info["data_offsets"]
+            count = (end - begin) // torch.empty((), dtype=dtype).element_size()
+            if count == 0:
+                t = torch.empty(0, dtype=dtype)
+            else:
+                t = torch.frombuffer(mm, dtype=dtype, count=count, offset=base + begin)
+            state[name] = t.reshape(info["shape"])
+    for name, target in json.loads(meta.get("aliases", "{}")).items():
+        state[name] = state[target]
+    return state
+
+def load_mmap_tts(st_path, config_path):
+    '''Coqui TTS object whose model parameters live in the mapped safetensors file'''
+    from app.tts_engine import import_coqui
+    TTS = import_coqui()
+    from TTS.config import load_config
+    from TTS.tts.models import setup_model
+    from TTS.utils.synthesizer import Synthesizer
+
+    config = load_config(str(config_path))
+    model = setup_model(config)
+    model.load_state_dict(mmap_state_dict(st_path), strict=True, assign=True)
+    model.eval()
+
+    # Same objects Synthesizer._load_tts would build, minus torch.load
+    synth = Synthesizer(use_cuda=False)
+    synth.tts_config = config
+    synth.tts_model = model
+    synth.output_sample_rate = config.audio["sample_rate"]
+    if getattr(synth, "seg", None) is None:
+        synth.seg = synth._get_segmenter("en")
+
+    tts = TTS(progress_bar=False, gpu=False)
+    tts.synthesizer = synth
+    return tts
+
+if __name__ == "__main__":
+    import sys
+    for name in sys.argv[1:] or ["tts_models/es/css10/vits", "tts_models/en/ljspeech/vits"]:
+        print(convert_to_safetensors(name, log=print))
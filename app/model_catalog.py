@@ -0,0 +1,160 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Coqui model catalog, parsed once and cached (memory + disk), with installed status
+# from the model index and incremental search for the Model Manager window.
+# Also keeps the sha256 of every downloaded model file (the Coqui catalog has no usable
+# checksums): recorded on first download, verified on every later one.
+
+import os
+import json
+import threading
+from importlib import metadata
+
+from app.model_manager import BASE_DIR, list_models, normalize_model_name
+
+CATALOG_PATH = BASE_DIR / "ajtts_catalog.json"
+HASHES_PATH = BASE_DIR / "ajtts_hashes.json" # own file: survives catalog invalidation
+
+def _coqui_version() -> str:
+    try:
+        return metadata.version("coqui-tts")
+    except metadata.PackageNotFoundError:
+        try:
+            return metadata.version("TTS")
+        except metadata.PackageNotFoundError:
+            return "unknown"
+
+class ModelCatalog:
+    def __init__(self, path=CATALOG_PATH, lister=None, hashes_path=HASHES_PATH):
+        self.path = path
+        self.hashes_path = hashes_path
+        self._hashes = None # url -> sha256
+        self._lister = lister or list_models
+        self._lock = threading.Lock()
+        self._names = None
+        self._lower = None
+        self._installed = None
+        self._last_query = None
+        self._last_matches = None
+
+    # Catalog
+    def names(self) -> list[str]:
+        '''Filtered Coqui model ids; the catalog only changes with the Coqui release'''
+        with self._lock:
+            if self._names is None:
+                self._names = self._load() or self._fetch()
+                self._lower = [n.lower() for n in self._names]
+            return self._names
+
+    def invalidate(self):
+        '''Drop the cached catalog (memory and disk) and the installed set'''
+        with self._lock:
+            self._names = self._lower = None
+            self._installed = None
+            self._last_query = self._last_matches = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return None
+        if data.get("coqui") != _coqui_version():
+            return None
+        return data.get("models") or None
+
+    def _fetch(self) -> list[str]:
+        names = list(self._lister())
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"coqui": _coqui_version(), "models": names}))
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+        return names
+
+    # File hashes
+    def file_hash(self, url: str):
+        '''sha256 recorded for url on an earlier download, or None'''
+        with self._lock:
+            return self._load_hashes().get(url)
+
+    def record_file_hash(self, url: str, sha256: str):
+        with self._lock:
+            hashes = self._load_hashes()
+            if hashes.get(url) == sha256:
+                return
+            hashes[url] = sha256
+            try:
+                self.hashes_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.hashes_path.with_name(f"{self.hashes_path.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(hashes, indent=1, sort_keys=True))
+                os.replace(tmp, self.hashes_path)
+            except OSError:
+                pass
+
+    def _load_hashes(self) -> dict:
+        if self._hashes is None:
+            try:
+                self._hashes = dict(json.loads(self.hashes_path.read_text()))
+            except (OSError, ValueError, TypeError):
+                self._hashes = {}
+        return self._hashes
+
+    # Installed status
+    def installed(self) -> set[str]:
+        '''Installed catalog ids, from one pass over the model index'''
+        names = self.names()
+        with self._lock:
+            if self._installed is None:
+                from app.model_index import get_model_index
+                prefix = str(BASE_DIR) + os.sep
+                folders = {os.path.basename(p).lower()
+                           for p in get_model_index().models() if p.startswith(prefix)}
+                self._installed = {n for n in names if normalize_model_name(n).lower() in folders}
+            return self._installed
+
+    def is_installed(self, model_name: str) -> bool:
+        return model_name in self.installed()
+
+    def refresh_installed(self):
+        '''Re-read installed status after a download/delete'''
+        from app.model_index import get_model_index
+        get_model_index().invalidate()
+        with self._lock:
+            self._installed = None
+
+    # Search
+    def search(self, query: str) -> set[str]:
+        '''Case-insensitive substring match. Narrows the previous result while the user types'''
+        q = query.strip().lower()
+        names = self.names()
+        if not q:
+            matches = set(names)
+        else:
+            with self._lock:
+                prev_q, prev = self._last_query, self._last_matches
+            if prev_q and prev_q in q:
+                # Anything matching the longer query also matched the shorter one
+                matches = {n for n in prev if q in n.lower()}
+            else:
+                matches = {n for n, low in zip(names, self._lower) if q in low}
+        with self._lock:
+            self._last_query, self._last_matches = q, matches
+        return matches
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def get_model_catalog() -> ModelCatalog:
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = ModelCatalog()
+        return _catalog
@@ -0,0 +1,239 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Persistent index of local models: model folder -> config, weights (size, mtime, sha256).
+# Refreshed incrementally from directory mtimes: one stat per root and per model folder
+# instead of globbing every folder on every lookup.
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+INDEX_VERSION = 1
+WEIGHT_SUFFIXES = (".pth", ".pt", ".onnx") # preference order, as in _find_paths_in
+REFRESH_INTERVAL_S = 1.0
+
+# Same locations as tts_engine.ASSETS_MODELS_DIR / CACHE_DIR (kept here so model_manager
+# can use the index without importing the engine)
+ASSETS_MODELS_DIR = Path(__file__).resolve().parent / "assets" / "models"
+CACHE_DIR = Path.home() / ".local" / "share" / "tts"
+
+def _skip(name: str) -> bool:
+    # Our own caches/staging areas living in the same directory as the models
+    return name.startswith(".") or name.startswith("ajtts_")
+
+def scan_folder(folder: Path, previous: dict = None) -> dict:
+    '''One scandir pass over a model folder. Hashes are carried over while size/mtime match'''
+    previous = previous or {}
+    old_files = previous.get("files", {})
+    files = {}
+    with os.scandir(folder) as it:
+        for e in it:
+            if not e.is_file():
+                continue
+            st = e.stat()
+            info = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": None}
+            old = old_files.get(e.name)
+            if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                info["sha256"] = old.get("sha256")
+            files[e.name] = info
+    return {
+        "dir_mtime_ns": folder.stat().st_mtime_ns,
+        "files": files,
+        "config": "config.json" if "config.json" in files else None,
+        "weights": [n for suf in WEIGHT_SUFFIXES for n in sorted(files) if n.endswith(suf)],
+    }
+
+class ModelIndex:
+    def __init__(self, roots, path=None):
+        self.roots = [Path(r) for r in roots] # lookup preference order
+        self.path = Path(path) if path else None
+        self._lock = threading.RLock()
+        self._roots = {} # root -> {"mtime_ns", "folders": [names]}
+        self._folders = {} # folder path -> scan_folder() entry
+        self._by_name = {} # (root, lower-case folder name) -> folder path
+        self._last_refresh = 0.0
+        self._dirty = False
+        self._load()
+
+    # Queries
+    def lookup(self, folder_name: str, roots=None, refresh: bool = True):
+        '''(folder, entry) for a normalized model folder name, first root wins. Case-insensitive'''
+        if refresh:
+            self.refresh()
+        with self._lock:
+            for root in (roots or self.roots):
+                folder = self._by_name.get((str(Path(root)), folder_name.lower()))
+                if folder is not None:
+                    return Path(folder), self._folders[folder]
+        return None, None
+
+    def entry(self, folder: Path, refresh: bool = True):
+        '''Index entry for any folder; folders outside the roots are scanned (not kept)'''
+        if refresh:
+            self.refresh()
+        with self._lock:
+            e = self._folders.get(str(folder))
+        if e is not None:
+            return e
+        try:
+            return scan_folder(folder)
+        except OSError:
+            return None
+
+    def paths(self, folder: Path, entry: dict = None):
+        '''(model_path, config_path) like _find_paths_in'''
+        entry = entry or self.entry(folder)
+        if not entry:
+            return (None, None)
+        model_path = folder / entry["weights"][0] if entry["weights"] else None
+        config_path = folder / entry["config"] if entry["config"] else None
+        return (model_path, config_path)
+
+    def content_hash(self, file_path: Path) -> str:
+        '''sha256 of a model file, computed once and kept while size/mtime do not change.
+        The file is re-stat'ed: rewriting it in place does not touch the folder mtime'''
+        folder, name = str(file_path.parent), file_path.name
+        st = os.stat(file_path)
+        with self._lock:
+            info = self._folders.get(folder, {}).get("files", {}).get(name)
+            if (info and info.get("sha256") and info["size"] == st.st_size
+                    and info["mtime_ns"] == st.st_mtime_ns):
+                return info["sha256"]
+        h = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        with self._lock:
+            if info is not None:
+                info.update(size=st.st_size, mtime_ns=st.st_mtime_ns, sha256=digest)
+                self._dirty = True
+                self._save()
+        return digest
+
+    def models(self, refresh: bool = True) -> dict:
+        '''folder path -> entry, for every indexed folder'''
+        if refresh:
+            self.refresh()
+        with self._lock:
+            return dict(self._folders)
+
+    # Refresh
+    def refresh(self, force: bool = False) -> bool:
+        '''Re-stat roots and folders; only changed ones are rescanned. True if anything changed'''
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_refresh < REFRESH_INTERVAL_S:
+                return False
+            self._last_refresh = now
+            changed = False
+            for root in self.roots:
+                changed |= self._refresh_root(root)
+            if changed:
+                self._dirty = True
+                self._save()
+            return changed
+
+    def invalidate(self, folder: Path = None):
+        '''Force a rescan on next lookup (e.g. right after installing/deleting a model)'''
+        with self._lock:
+            if folder is not None and str(folder) in self._folders:
+                self._folders[str(folder)]["dir_mtime_ns"] = -1
+            for r in self._roots.values():
+                r["mtime_ns"] = -1
+            self._last_refresh = 0.0
+
+    def _refresh_root(self, root: Path) -> bool:
+        key = str(root)
+        try:
+            mtime = root.stat().st_mtime_ns
+        except OSError:
+            if key in self._roots:
+                for name in self._roots.pop(key)["folders"]:
+                    self._forget(root, name)
+                return True
+            return False
+
+        changed = False
+        known = self._roots.get(key)
+        if known is None or known["mtime_ns"] != mtime:
+            names = sorted(e.name for e in os.scandir(root) if e.is_dir() and not _skip(e.name))
+            old = set(known["folders"]) if known else set()
+            for name in old - set(names):
+                self._forget(root, name)
+            # Our own ajtts_* files (this index, catalog, phoneme DB) live in the cache root
+            # and bump its mtime: only a different set of model folders is a change
+            changed = known is None or known["folders"] != names
+            self._roots[key] = {"mtime_ns": mtime, "folders": names}
+
+        for name in self._roots[key]["folders"]:
+            folder = root / name
+            prev = self._folders.get(str(folder))
+            try:
+                dir_mtime = folder.stat().st_mtime_ns
+                if prev is None or prev["dir_mtime_ns"] != dir_mtime:
+                    self._folders[str(folder)] = scan_folder(folder, prev)
+                    changed = True
+            except OSError:
+                self._forget(root, name)
+                changed = True
+                continue
+            self._by_name[(key, name.lower())] = str(folder)
+        return changed
+
+    def _forget(self, root: Path, name: str):
+        folder = str(Path(root) / name)
+        self._folders.pop(folder, None)
+        self._by_name.pop((str(root), name.lower()), None)
+
+    # Persistence
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        roots = {str(r) for r in self.roots}
+        self._roots = {k: v for k, v in data.get("roots", {}).items() if k in roots}
+        self._folders = data.get("folders", {})
+        for key, r in self._roots.items():
+            for name in r["folders"]:
+                if str(Path(key) / name) in self._folders:
+                    self._by_name[(key, name.lower())] = str(Path(key) / name)
+
+    def _save(self):
+        if not self.path or not self._dirty:
+            return
+        data = {"version": INDEX_VERSION, "roots": self._roots, "folders": self._folders}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, self.path)
+            self._dirty = False
+            # The rename just bumped the parent's mtime; do not rescan it for our own write
+            root = self._roots.get(str(self.path.parent))
+            if root is not None:
+                root["mtime_ns"] = self.path.parent.stat().st_mtime_ns
+        except OSError:
+            pass
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_model_index() -> ModelIndex:
+    '''Index over assets/models and ~/.local/share/tts, persisted next to the cached models'''
+    global _index
+    with _index_lock:
+        if _index is None:
+            path = os.environ.get("AJTTS_MODEL_INDEX") or (CACHE_DIR / "ajtts_index.json")
+            _index = ModelIndex([ASSETS_MODELS_DIR, CACHE_DIR], path)
+        return _index
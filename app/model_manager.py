@@ -1,16 +1,29 @@
 import os
 import shutil
+import threading
 from pathlib import Path
-from TTS.utils.manage import ModelManager
 
 os.environ["COQUI_TOS_AGREED"] = "1"
-model_manager = ModelManager()
+
+_model_manager = None
+_model_manager_lock = threading.Lock()
+
+def get_model_manager():
+    """Coqui ModelManager (catalog) shared by the whole app, built on first use."""
+    global _model_manager
+    with _model_manager_lock:
+        if _model_manager is None:
+            from app.tts_engine import import_coqui
+            import_coqui()
+            from TTS.utils.manage import ModelManager
+            _model_manager = ModelManager()
+        return _model_manager
 
 BASE_DIR = Path.home() / ".local/share/tts"
 
 def list_models():
     """Lista solo modelos en inglés y español."""
-    all_models = model_manager.list_models()
+    all_models = get_model_manager().list_models()
     filtered = [m for m in all_models if m.startswith("tts_models/en") or m.startswith("tts_models/es") or m.startswith("tts_models/multilingual")]
     return filtered
 
@@ -18,23 +31,26 @@ def normalize_model_name(model_name: str) -> str:
     return model_name.replace("/", "--")
 
 def find_model_path(model_name: str) -> Path | None:
-    if not BASE_DIR.exists():
-        return None
-
-    normalized_name = normalize_model_name(model_name).lower()
-
-    for folder in BASE_DIR.iterdir():
-        if folder.name.lower() == normalized_name:
-            return folder
-    return None
+    from app.model_index import get_model_index
+    folder, _ = get_model_index().lookup(normalize_model_name(model_name), roots=[BASE_DIR])
+    return folder
 
 def model_exists_locally(model_name: str) -> bool:
     return find_model_path(model_name) is not None
 
-def download_model(model_name: str):
-    if not model_exists_locally(model_name):
+def download_model(model_name: str, progress=None, log=None, force: bool = False):
+    '''progress(done_bytes, total_bytes) while fetching; resumes interrupted downloads.
+    force: fetch even if the folder exists (repairs a partial install)'''
+    if force or not model_exists_locally(model_name):
         print(f"Descargando modelo: {model_name}")
-        model_manager.download_model(model_name)
+        from app import downloader
+        try:
+            downloader.download_model(model_name, progress=progress, log=log)
+        except downloader.UnsupportedSource:
+            if force:
+                # Coqui skips folders that already exist
+                shutil.rmtree(BASE_DIR / normalize_model_name(model_name), ignore_errors=True)
+            get_model_manager().download_model(model_name)
     else:
         print(f"El modelo '{model_name}' ya está instalado.")
 
@@ -43,5 +59,7 @@ def delete_model(model_name: str):
     if path and path.exists():
         print(f"Eliminando modelo: {path}")
         shutil.rmtree(path)
+        from app.model_index import get_model_index
+        get_model_index().invalidate(path)
     else:
         print(f"El modelo '{model_name}' no está instalado.")
@@ -1,17 +1,23 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QComboBox, QDialog, QProgressBar, QLabel
-from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QComboBox, QDialog, QProgressBar, QLabel, QLineEdit
+from PySide6.QtCore import Qt, QThread, Signal, QSortFilterProxyModel
 from PySide6.QtGui import QStandardItemModel, QStandardItem
-from model_manager import list_models, model_exists_locally, download_model, delete_model
+from app.model_manager import download_model, delete_model
+from app.model_catalog import get_model_catalog
 
 class DownloadThread(QThread):
     finished = Signal()
+    progress = Signal(object, object) # done bytes, total bytes (may exceed 32-bit ints)
+    failed = Signal(str)
 
     def __init__(self, model_name):
         super().__init__()
         self.model_name = model_name
 
     def run(self):
-        download_model(self.model_name)
+        try:
+            download_model(self.model_name, progress=self.progress.emit)
+        except Exception as e:
+            self.failed.emit(str(e))
         self.finished.emit()
 
 class ProgressDialog(QDialog):
@@ -26,9 +32,34 @@ class ProgressDialog(QDialog):
         label.setAlignment(Qt.AlignCenter)
         layout.addWidget(label)
 
-        progress = QProgressBar()
-        progress.setRange(0, 0)  # Indeterminado
-        layout.addWidget(progress)
+        self.label = label
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)  # Indeterminado
+        layout.addWidget(self.progress)
+
+    def set_progress(self, done, total):
+        '''Byte progress; stays indeterminate while the size is unknown'''
+        if not total:
+            return
+        self.progress.setRange(0, 1000)
+        self.progress.setValue(int(done * 1000 / total))
+        self.progress.setFormat(f"{done / 1048576:.1f} / {total / 1048576:.1f} MB")
+
+class CatalogFilterProxy(QSortFilterProxyModel):
+    '''Shows only the ids in `allowed` (None = everything); the source model is never rebuilt'''
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.allowed = None
+
+    def set_allowed(self, allowed):
+        self.allowed = allowed
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.allowed is None:
+            return True
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        return self.sourceModel().data(index) in self.allowed
 
 class ModelManagerWindow(QWidget):
     model_downloaded = Signal(str)
@@ -41,9 +72,21 @@ class ModelManagerWindow(QWidget):
 
         layout = QVBoxLayout(self)
 
-        # Models list
+        self.catalog = get_model_catalog()
+
+        # Search
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search models…")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self.filter_models)
+        layout.addWidget(self.search_edit)
+
+        # Models list (built once; search only changes the proxy filter)
+        self.catalog_model = QStandardItemModel(self)
+        self.proxy_model = CatalogFilterProxy(self)
+        self.proxy_model.setSourceModel(self.catalog_model)
         self.model_list_combo = QComboBox()
-        self.model_list_combo.addItems(list_models())
+        self.model_list_combo.setModel(self.proxy_model)
         self.model_list_combo.currentTextChanged.connect(self.update_buttons)
         self.model_list_combo.activated.connect(self.user_selected_model)
         layout.addWidget(self.model_list_combo)
@@ -58,13 +101,13 @@ class ModelManagerWindow(QWidget):
         self.btn_delete.clicked.connect(self.delete_selected)
         layout.addWidget(self.btn_delete)
 
+        self.populate_model_list()
+
         # Initial state
         self.update_buttons(self.model_list_combo.currentText())
 
-        self.populate_model_list()
-
     def update_buttons(self, model_name):
-        if model_exists_locally(model_name):
+        if self.catalog.is_installed(model_name):
             self.btn_download.setEnabled(False)
             self.btn_delete.setEnabled(True)
         else:
@@ -80,6 +123,8 @@ class ModelManagerWindow(QWidget):
 
         # Start download thread
         self.download_thread = DownloadThread(model_name)
+        self.download_thread.progress.connect(self.progress_dialog.set_progress)
+        self.download_thread.failed.connect(lambda msg: print(f"Download failed: {msg}"))
         self.download_thread.finished.connect(lambda: self.on_download_finished(model_name))
         self.download_thread.start()
 
@@ -92,8 +137,9 @@ class ModelManagerWindow(QWidget):
 
     def on_download_finished(self, model_name):
         self.progress_dialog.close()
+        self.catalog.refresh_installed()
+        self.refresh_installed_status()
         self.update_buttons(model_name)
-        self.populate_model_list()
 
         # Emit signal to set this model as active
         self.model_downloaded.emit(model_name)
@@ -101,29 +147,41 @@ class ModelManagerWindow(QWidget):
     def delete_selected(self):
         model_name = self.model_list_combo.currentText()
         delete_model(model_name)
+        self.catalog.refresh_installed()
+        self.refresh_installed_status()
         self.update_buttons(model_name)
-        self.populate_model_list()
 
         self.model_deleted.emit(model_name)
     
 
     def populate_model_list(self):
-        self.model_list_combo.clear()
-
-        combo_model = QStandardItemModel()
-
-        for model in list_models():
+        self.catalog_model.clear()
+        installed = self.catalog.installed()
+        for model in self.catalog.names():
             item = QStandardItem(model)
-            if model_exists_locally(model):
-                item.setForeground(Qt.green)
-                font = item.font()
-                font.setBold(True)
-                item.setFont(font)
-            combo_model.appendRow(item)
+            self._style_item(item, model in installed)
+            self.catalog_model.appendRow(item)
+
+    def refresh_installed_status(self):
+        '''Restyle items in place after a download/delete'''
+        installed = self.catalog.installed()
+        for row in range(self.catalog_model.rowCount()):
+            item = self.catalog_model.item(row)
+            self._style_item(item, item.text() in installed)
+
+    def _style_item(self, item, installed):
+        if installed:
+            item.setForeground(Qt.green)
+        else:
+            item.setData(None, Qt.ForegroundRole) # theme default
+        font = item.font()
+        font.setBold(installed)
+        item.setFont(font)
 
-        self.model_list_combo.setModel(combo_model)
+    def filter_models(self, text):
+        self.proxy_model.set_allowed(self.catalog.search(text) if text.strip() else None)
 
     def user_selected_model(self, index):
         model_name = self.model_list_combo.itemText(index)
-        if model_exists_locally(model_name):
+        if self.catalog.is_installed(model_name):
             self.model_downloaded.emit(model_name)
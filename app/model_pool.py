@@ -0,0 +1,150 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# LRU pool of loaded AquaTTS engines, keyed by resolved model path.
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from app.tts_engine import AquaTTS, resolve_model, logger
+
+POOL_MAX_MODELS = int(os.environ.get("AJTTS_POOL_MAX_MODELS", "3"))
+POOL_MAX_MB = int(os.environ.get("AJTTS_POOL_MAX_MB", "1024"))
+
+def pool_key(model_name: str) -> str:
+    '''Same weights on disk -> same key, however the model was named'''
+    model_path, _ = resolve_model(model_name)
+    if model_path:
+        return str(Path(model_path).resolve())
+    return model_name
+
+class ModelPool:
+    def __init__(self, max_models: int = None, max_mb: int = None, factory=AquaTTS, threads=None):
+        self.max_models = max(1, max_models if max_models is not None else POOL_MAX_MODELS)
+        self.max_bytes = (max_mb if max_mb is not None else POOL_MAX_MB) * 1024 * 1024
+        self.factory = factory
+        self.threads = threads # ThreadConfig for every engine; None -> ThreadConfig.load()
+
+        self._engines = OrderedDict() # key -> engine, most recent last
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._loading = {} # key -> lock, so one model is never loaded twice at once
+        self._evict_listeners = []
+        self._dropped = [] # (key, engine) dropped under the lock, announced after it
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model_name: str) -> AquaTTS:
+        '''Loaded engine for model_name; loads (and maybe evicts) on a miss'''
+        key = pool_key(model_name)
+        with self._lock:
+            engine = self._touch(key)
+            if engine is not None:
+                self.hits += 1
+                return engine
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                engine = self._touch(key)
+                if engine is not None:
+                    # Loaded by another thread while we waited
+                    self.hits += 1
+                    return engine
+                self.misses += 1
+
+            if self.threads is None:
+                engine = self.factory(model_name)
+            else:
+                engine = self.factory(model_name, threads=self.threads)
+            size = engine.memory_bytes() if hasattr(engine, "memory_bytes") else 0
+
+            with self._lock:
+                self._engines[key] = engine
+                self._sizes[key] = size
+                self._loading.pop(key, None)
+                self._evict_over_budget(keep=key)
+        self._announce_dropped()
+        return engine
+
+    def contains(self, model_name: str) -> bool:
+        with self._lock:
+            return pool_key(model_name) in self._engines
+
+    def evict(self, model_name: str) -> bool:
+        key = pool_key(model_name)
+        with self._lock:
+            if key not in self._engines:
+                # Weights may already be gone from disk: match by name
+                key = next((k for k, e in self._engines.items()
+                            if getattr(e, "model_name", None) == model_name), None)
+            if key is None:
+                return False
+            self._drop(key)
+        self._announce_dropped()
+        return True
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._engines):
+                self._drop(key)
+        self._announce_dropped()
+
+    def add_evict_listener(self, fn):
+        '''fn(key, engine) after an engine leaves the pool (budget, evict() or clear())'''
+        self._evict_listeners.append(fn)
+
+    def _announce_dropped(self):
+        with self._lock:
+            dropped, self._dropped = self._dropped, []
+        for key, engine in dropped:
+            for fn in list(self._evict_listeners):
+                try:
+                    fn(key, engine)
+                except Exception as e:
+                    logger.warning("[pool] evict listener failed: %s", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "models": len(self._engines),
+                "bytes": sum(self._sizes.values()),
+                "max_models": self.max_models,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    # Internals (call with self._lock held)
+    def _touch(self, key):
+        engine = self._engines.get(key)
+        if engine is not None:
+            self._engines.move_to_end(key)
+        return engine
+
+    def _drop(self, key):
+        engine = self._engines.pop(key, None)
+        self._sizes.pop(key, None)
+        if engine is not None:
+            self._dropped.append((key, engine))
+            logger.info("[pool] evicted %s", getattr(engine, "model_name", key))
+
+    def _evict_over_budget(self, keep):
+        def over():
+            return (len(self._engines) > self.max_models
+                    or sum(self._sizes.values()) > self.max_bytes)
+
+        while over() and len(self._engines) > 1:
+            oldest = next(iter(self._engines))
+            if oldest == keep:
+                break
+            self._drop(oldest)
+            self.evictions += 1
@@ -0,0 +1,123 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# ONNX Runtime (CPU) backend for VITS voices, plus the export step that creates the graph.
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+ONNX_FILENAME = "model.onnx"
+
+def onnxruntime_available() -> bool:
+    try:
+        import onnxruntime # noqa: F401
+        return True
+    except Exception:
+        return False
+
+def find_onnx(config_path) -> Path | None:
+    '''ONNX graph stored next to config.json, if any'''
+    if not config_path:
+        return None
+    folder = Path(config_path).parent
+    p = folder / ONNX_FILENAME
+    if p.exists():
+        return p
+    return next(iter(sorted(folder.glob("*.onnx"))), None)
+
+def export_onnx(model_name: str, log=None) -> Path:
+    '''Export a resolved VITS checkpoint to <model dir>/model.onnx'''
+    from app.tts_engine import resolve_model, torch_tts
+
+    log = log or (lambda *_: None)
+    model_path, config_path = resolve_model(model_name)
+    if not (model_path and config_path) or Path(model_path).suffix == ".onnx":
+        raise FileNotFoundError(f"No local PyTorch checkpoint for {model_name}")
+
+    tts = torch_tts(model_path, config_path)
+    model = tts.synthesizer.tts_model
+    if type(model).__name__ != "Vits":
+        raise ValueError(f"ONNX export is only supported for VITS models, not {type(model).__name__}")
+
+    out = Path(config_path).parent / ONNX_FILENAME
+    tmp = out.with_name(out.name + ".tmp")
+    log(f"Exporting {model_name} -> {out}")
+    model.export_onnx(output_path=str(tmp), verbose=False)
+    os.replace(tmp, out)
+    return out
+
+class OnnxVits:
+    '''Same text frontend as Coqui (tokenizer/phonemizer from config.json), ORT for the network'''
+
+    def __init__(self, onnx_path, config_path, threads: int = None):
+        import onnxruntime as ort
+        from app.tts_engine import import_coqui
+        import_coqui() # typeguard patch before any Coqui module
+        from TTS.config import load_config
+        from TTS.tts.utils.text.tokenizer import TTSTokenizer
+
+        self.onnx_path = Path(onnx_path)
+        config = load_config(str(config_path))
+        self.tokenizer, self.config = TTSTokenizer.init_from_config(config)
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            opts.intra_op_num_threads = int(threads)
+        self.session = ort.InferenceSession(
+            str(onnx_path), sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+
+        args = self.config.model_args
+        self.scales = np.array([
+            getattr(args, "inference_noise_scale", 0.667),
+            getattr(args, "length_scale", 1.0),
+            getattr(args, "inference_noise_scale_dp", 1.0),
+        ], dtype=np.float32)
+        self.sample_rate = int(self.config.audio["sample_rate"])
+        self._ap = None
+
+    def _trim(self, wav):
+        audio = self.config.audio
+        if not ("do_trim_silence" in audio and audio["do_trim_silence"]):
+            return wav
+        if self._ap is None:
+            from TTS.utils.audio import AudioProcessor
+            self._ap = AudioProcessor.init_from_config(self.config, verbose=False)
+        return wav[: self._ap.find_endpoint(wav)]
+
+    def synthesize(self, text: str, cancel=None) -> np.ndarray:
+        '''One sentence -> float32 samples. A CancelToken terminates the running session'''
+        ids = np.asarray(self.tokenizer.text_to_ids(text), dtype=np.int64)[None, :]
+        feeds = {
+            "input": ids,
+            "input_lengths": np.array([ids.shape[1]], dtype=np.int64),
+            "scales": self.scales,
+        }
+        if cancel is None or not hasattr(cancel, "add_callback"):
+            wav = self.session.run(["output"], feeds)[0]
+        else:
+            import onnxruntime as ort
+            from app.tts_engine import SynthesisCancelled
+            options = ort.RunOptions()
+            remove = cancel.add_callback(lambda: setattr(options, "terminate", True))
+            try:
+                wav = self.session.run(["output"], feeds, options)[0]
+            except Exception:
+                if cancel.is_set():
+                    raise SynthesisCancelled()
+                raise
+            finally:
+                remove()
+        return self._trim(np.asarray(wav, dtype=np.float32).reshape(-1))
+
+    def memory_bytes(self) -> int:
+        return self.onnx_path.stat().st_size
+
+if __name__ == "__main__":
+    import sys
+    for name in sys.argv[1:] or ["tts_models/es/css10/vits", "tts_models/en/ljspeech/vits"]:
+        print(export_onnx(name, log=print))
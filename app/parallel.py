@@ -0,0 +1,107 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Multi-process synthesis: N worker processes, each with its own copy of the model,
+# fed sentence chunks and reassembled in order.
+
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_THREADS_PER_WORKER = 2
+
+_engine = None # one AquaTTS per worker process
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def plan_workers(workers: int = None, threads_per_worker: int = None):
+    '''(workers, intra-op threads per worker) so that workers * threads <= cpus'''
+    cpus = available_cpus()
+    if workers is None:
+        threads = threads_per_worker or min(DEFAULT_THREADS_PER_WORKER, cpus)
+        workers = max(1, cpus // threads)
+    workers = max(1, int(workers))
+    if threads_per_worker is None:
+        threads_per_worker = max(1, cpus // workers)
+    return workers, max(1, int(threads_per_worker))
+
+def _init_worker(model_name: str, threads: int):
+    global _engine
+    # Before torch spins up its pools
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    from app.tts_engine import AquaTTS
+    from app.threads import ThreadConfig
+    _engine = AquaTTS(model_name, threads=ThreadConfig(intra_op=threads, interop=1))
+
+def _ping() -> int:
+    return os.getpid()
+
+def _synthesize(text: str, split_sentences: bool):
+    return _engine._infer_cached(text, split_sentences), _engine.sample_rate
+
+def _synthesize_long(text: str):
+    # Same path as in-process callers: split_sentences + batching + sentence joins
+    return _engine.synthesize_long(text)
+
+class ParallelSynthesizer:
+    def __init__(self, model_name: str, workers: int = None, threads_per_worker: int = None):
+        self.model_name = model_name
+        self.workers, self.threads_per_worker = plan_workers(workers, threads_per_worker)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp.get_context("spawn"), # never fork a process that holds torch state
+            initializer=_init_worker,
+            initargs=(model_name, self.threads_per_worker),
+        )
+
+    def warm_up(self) -> int:
+        '''Start every worker and load its model now. Returns the number of worker processes seen'''
+        futures = [self._pool.submit(_ping) for _ in range(self.workers)]
+        return len({f.result() for f in futures})
+
+    def submit(self, text: str, split_sentences: bool = True):
+        '''Future -> (samples, sample_rate) for a whole text, on any worker'''
+        return self._pool.submit(_synthesize, text, split_sentences)
+
+    def submit_long(self, text: str):
+        '''Future -> AquaTTS.synthesize_long(text) on any worker: same audio as in-process'''
+        return self._pool.submit(_synthesize_long, text)
+
+    def iter_pcm_chunks(self, text: str):
+        '''Like AquaTTS.iter_pcm_chunks, but all sentences are synthesized in parallel'''
+        from app.tts_engine import split_sentences, sentence_chunk
+
+        futures = [self.submit(s, split_sentences=False) for s in split_sentences(text)]
+        try:
+            for f in futures:
+                samples, sr = f.result()
+                yield sentence_chunk(samples, sr), sr
+        finally:
+            for f in futures:
+                f.cancel()
+
+    def synthesize_to_pcm(self, text: str):
+        '''Whole text -> (samples, sample_rate), reassembled in sentence order'''
+        if not text:
+            raise ValueError("Empty text")
+        chunks = list(self.iter_pcm_chunks(text))
+        if not chunks:
+            raise ValueError("Empty text")
+        return np.concatenate([c for c, _ in chunks]), chunks[0][1]
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
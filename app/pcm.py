@@ -0,0 +1,74 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Helpers for raw mono PCM kept in memory (numpy arrays).
+
+import io
+import wave
+
+import numpy as np
+
+def to_float32(samples) -> np.ndarray:
+    '''Any sample sequence -> contiguous mono float32 in [-1, 1]'''
+    a = np.asarray(samples)
+    if a.dtype == np.int16:
+        return (a.astype(np.float32) / 32768.0).reshape(-1)
+    return np.ascontiguousarray(a, dtype=np.float32).reshape(-1)
+
+def to_int16(samples) -> np.ndarray:
+    '''Float samples -> int16 PCM (clipped)'''
+    a = np.asarray(samples)
+    if a.dtype == np.int16:
+        return a.reshape(-1)
+    a = np.clip(a.astype(np.float32, copy=False), -1.0, 1.0)
+    return (a * 32767.0).astype(np.int16).reshape(-1)
+
+def change_rate(samples, rate: float) -> np.ndarray:
+    '''Tape-style speed change: rate > 1 is faster and higher pitched'''
+    a = to_float32(samples)
+    if not rate or abs(rate - 1.0) < 1e-3 or a.size < 2:
+        return a
+    n = max(1, int(round(a.size / rate)))
+    x = np.linspace(0.0, a.size - 1, n, dtype=np.float64)
+    return np.interp(x, np.arange(a.size), a).astype(np.float32)
+
+def duration(samples, sample_rate: int) -> float:
+    return len(samples) / float(sample_rate) if sample_rate else 0.0
+
+def wav_bytes(samples, sample_rate: int) -> bytes:
+    '''Encode mono samples as a 16-bit WAV, in memory'''
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(int(sample_rate))
+        w.writeframes(to_int16(samples).tobytes())
+    return buf.getvalue()
+
+def write_wav(path: str, samples, sample_rate: int) -> str:
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(int(sample_rate))
+        w.writeframes(to_int16(samples).tobytes())
+    return str(path)
+
+def silence(sample_rate: int, seconds: float) -> np.ndarray:
+    return np.zeros(int(sample_rate * seconds), dtype=np.float32)
+
+def fade_edges(samples, sample_rate: int, fade_ms: float = 5.0) -> np.ndarray:
+    '''Short linear fade in/out so consecutive chunks join without clicks'''
+    a = to_float32(samples).copy()
+    n = min(int(sample_rate * fade_ms / 1000.0), a.size // 2)
+    if n > 1:
+        ramp = np.linspace(0.0, 1.0, n, dtype=np.float32)
+        a[:n] *= ramp
+        a[-n:] *= ramp[::-1]
+    return a
+
+def trim_trailing_zeros(samples) -> np.ndarray:
+    '''Drop the exact-zero padding some backends append after each sentence'''
+    a = to_float32(samples)
+    nz = np.flatnonzero(a)
+    return a[:nz[-1] + 1] if nz.size else a[:0]
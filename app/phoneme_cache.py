@@ -0,0 +1,209 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Grapheme-to-phoneme cache for Coqui phonemizers (espeak & co).
+# Sentence and phrase level, in RAM (LRU) and persisted to a small sqlite file, itself
+# bounded (least recently used rows are pruned on flush).
+
+import os
+import time
+import atexit
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+PHONEME_CACHE_PATH = Path(os.environ.get(
+    "AJTTS_PHONEME_CACHE", Path.home() / ".local" / "share" / "tts" / "ajtts_phonemes.sqlite"
+))
+PHONEME_CACHE_ENTRIES = int(os.environ.get("AJTTS_PHONEME_CACHE_ENTRIES", "50000"))
+PHONEME_DB_ENTRIES = int(os.environ.get("AJTTS_PHONEME_DB_ENTRIES", "500000"))
+FLUSH_EVERY = 64
+
+LEVEL_SENTENCE = 0
+LEVEL_PHRASE = 1 # punctuation-free segments / words, as espeak sees them
+
+class PhonemeStore:
+    def __init__(self, path=None, max_entries: int = None, max_db_entries: int = None):
+        self.path = Path(path) if path else PHONEME_CACHE_PATH
+        self.max_entries = max_entries if max_entries is not None else PHONEME_CACHE_ENTRIES
+        self.max_db_entries = max_db_entries if max_db_entries is not None else PHONEME_DB_ENTRIES
+        self._mem = OrderedDict()
+        self._dirty = []
+        self._touched = set() # keys read from the db since the last flush (LRU clock)
+        self._db_rows = None # approximate row count
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, ns: str, level: int, text: str):
+        key = (ns, level, text)
+        with self._lock:
+            ph = self._mem.get(key)
+            if ph is None:
+                ph = self._db_get(key)
+                if ph is None:
+                    self.misses += 1
+                    return None
+                self._remember(key, ph)
+                self._touched.add(key)
+            else:
+                self._mem.move_to_end(key)
+            self.hits += 1
+            return ph
+
+    def put(self, ns: str, level: int, text: str, ph: str):
+        key = (ns, level, text)
+        with self._lock:
+            self._remember(key, ph)
+            self._dirty.append((ns, level, text, ph))
+            if len(self._dirty) >= FLUSH_EVERY:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "mem_entries": len(self._mem),
+                "db_entries": self._db_rows or 0,
+            }
+
+    # Internals (call with self._lock held)
+    def _remember(self, key, ph):
+        self._mem[key] = ph
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _conn(self):
+        if self._db is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS phonemes ("
+                    "ns TEXT, level INTEGER, text TEXT, ph TEXT, last_used INTEGER DEFAULT 0, "
+                    "PRIMARY KEY (ns, level, text)) WITHOUT ROWID"
+                )
+                cols = [r[1] for r in self._db.execute("PRAGMA table_info(phonemes)")]
+                if "last_used" not in cols: # store written before the bound existed
+                    self._db.execute("ALTER TABLE phonemes ADD COLUMN last_used INTEGER DEFAULT 0")
+                self._db.execute("CREATE INDEX IF NOT EXISTS phonemes_lru ON phonemes (last_used)")
+                self._db_rows = self._db.execute("SELECT COUNT(*) FROM phonemes").fetchone()[0]
+            except sqlite3.Error:
+                self._db = False # unusable; stay memory-only
+        return self._db or None
+
+    def _db_get(self, key):
+        db = self._conn()
+        if db is None:
+            return None
+        row = db.execute(
+            "SELECT ph FROM phonemes WHERE ns=? AND level=? AND text=?", key
+        ).fetchone()
+        return row[0] if row else None
+
+    def _flush(self):
+        rows, self._dirty = self._dirty, []
+        touched, self._touched = self._touched, set()
+        db = self._conn()
+        if db is None or not (rows or touched):
+            return
+        now = int(time.time())
+        try:
+            with db:
+                db.executemany("INSERT OR REPLACE INTO phonemes VALUES (?, ?, ?, ?, ?)",
+                               [row + (now,) for row in rows])
+                db.executemany("UPDATE phonemes SET last_used=? WHERE ns=? AND level=? AND text=?",
+                               [(now,) + key for key in touched])
+                self._db_rows += len(rows) # REPLACEs overcount; recounted before pruning
+                if self._db_rows > self.max_db_entries:
+                    self._prune(db)
+        except sqlite3.Error:
+            pass
+
+    def _prune(self, db):
+        # Down to 90% so we do not prune on every flush
+        self._db_rows = db.execute("SELECT COUNT(*) FROM phonemes").fetchone()[0]
+        excess = self._db_rows - int(self.max_db_entries * 0.9)
+        if self._db_rows <= self.max_db_entries or excess <= 0:
+            return
+        db.execute(
+            "DELETE FROM phonemes WHERE (ns, level, text) IN ("
+            "SELECT ns, level, text FROM phonemes ORDER BY last_used LIMIT ?)", (excess,)
+        )
+        self._db_rows -= excess
+
+class CachedPhonemizer:
+    '''Drop-in wrapper for a Coqui phonemizer; everything but phonemize() is delegated'''
+
+    def __init__(self, inner, store: PhonemeStore):
+        self._inner = inner
+        self._store = store
+        try:
+            self._backend = f"{inner.name()}-{inner.version()}"
+        except Exception:
+            self._backend = type(inner).__name__
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    def _ns(self, language, separator) -> str:
+        lang = language or getattr(self._inner, "language", "")
+        return f"{self._backend}|{lang}|{separator}"
+
+    def phonemize(self, text: str, separator="|", language: str = None) -> str:
+        ns = self._ns(language, separator)
+        ph = self._store.get(ns, LEVEL_SENTENCE, text)
+        if ph is not None:
+            return ph
+
+        inner = self._inner
+        if all(hasattr(inner, a) for a in ("_phonemize_preprocess", "_phonemize", "_phonemize_postprocess")):
+            # Same steps as BasePhonemizer.phonemize, with the espeak call cached per segment
+            segments, punctuations = inner._phonemize_preprocess(text)
+            phonemized = []
+            for seg in segments:
+                p = self._store.get(ns, LEVEL_PHRASE, seg)
+                if p is None:
+                    p = inner._phonemize(seg, separator)
+                    self._store.put(ns, LEVEL_PHRASE, seg, p)
+                phonemized.append(p)
+            ph = inner._phonemize_postprocess(phonemized, punctuations)
+        else:
+            ph = inner.phonemize(text, separator=separator, language=language)
+
+        self._store.put(ns, LEVEL_SENTENCE, text, ph)
+        return ph
+
+_default_store = None
+_default_lock = threading.Lock()
+
+def default_phoneme_store():
+    '''Process-wide store; None if AJTTS_PHONEME_CACHE_ENABLED=0'''
+    global _default_store
+    if os.environ.get("AJTTS_PHONEME_CACHE_ENABLED", "1") == "0":
+        return None
+    with _default_lock:
+        if _default_store is None:
+            _default_store = PhonemeStore()
+            atexit.register(_default_store.flush)
+        return _default_store
+
+def install_phoneme_cache(tokenizer, store=None) -> bool:
+    '''Wrap tokenizer.phonemizer in place. True if the cache is active'''
+    store = store or default_phoneme_store()
+    ph = getattr(tokenizer, "phonemizer", None)
+    if store is None or ph is None or isinstance(ph, CachedPhonemizer):
+        return isinstance(ph, CachedPhonemizer)
+    tokenizer.phonemizer = CachedPhonemizer(ph, store)
+    return True
@@ -2,13 +2,21 @@
 # Copyright (C) 2025  AzuDevCR (INL Creations)
 # Licensed under GPLv3 (see LICENSE file for details).
 
-from PySide6.QtCore import QObject, Signal, QUrl
-from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PySide6.QtCore import QObject, Signal, QUrl, QTimer
+from PySide6.QtMultimedia import (
+    QMediaPlayer, QAudioOutput, QAudioSink, QAudioFormat, QMediaDevices, QAudio
+)
 import os
 
+from app import tracing
+from app.pcm import to_int16, change_rate
+
+PUMP_INTERVAL_MS = 20
+SINK_BUFFER_S = 0.25 # device-side buffer; absorbs GUI-thread jitter between pumps
+
 class AudioController(QObject):
-    started = Signal(str) # file path when playback starts
-    finished = Signal(str) # file path when playback reaches EndOfMedia
+    started = Signal(str) # file path when playback starts ("" for in-memory audio)
+    finished = Signal(str) # file path when playback reaches EndOfMedia ("" for in-memory audio)
     stopped = Signal() # User stop or interruption
     error = Signal(str) # error str
 
@@ -21,6 +29,20 @@ class AudioController(QObject):
 
         self._current_path = ""
 
+        # In-memory (PCM) playback: QAudioSink in push mode, fed by a timer
+        self._sink = None
+        self._sink_dev = None
+        self._sink_rate = 0
+        self._pending = bytearray()
+        self._sink_fed = 0
+        self._stream_open = False
+        self._pcm_started = False
+        self._rate = 1.0
+        self._trace_marks = [] # (byte offset, request id): first byte of each request (AJTTS_TRACE)
+        self._pump_timer = QTimer(self)
+        self._pump_timer.setInterval(PUMP_INTERVAL_MS)
+        self._pump_timer.timeout.connect(self._pump)
+
         # Connections
         self._player.playbackStateChanged.connect(self._on_playback_state_changed)
         self._player.mediaStatusChanged.connect(self._on_media_status_changed)
@@ -43,12 +65,64 @@ class AudioController(QObject):
         if not file_path or not os.path.exists(file_path):
             self.error.emit(f"File not found: {file_path}")
             return
+        self._close_sink()
         self._current_path = file_path
         self._player.setSource(QUrl.fromLocalFile(file_path))
         self._player.play()
 
+    def play_pcm(self, samples, sample_rate: int):
+        """Play mono samples (float or int16) from memory. Replaces any current playback."""
+        self.stop()
+        if samples is None or len(samples) == 0:
+            self.error.emit("No audio to play")
+            return
+        if not self._open_sink(sample_rate):
+            return
+        self._pending += self._encode(samples)
+        self._pump()
+
+    def begin_stream(self, sample_rate: int) -> bool:
+        """Open a gapless stream; feed it with feed_pcm() and close it with end_stream()."""
+        self.stop()
+        if not self._open_sink(sample_rate):
+            return False
+        self._stream_open = True
+        return True
+
+    def feed_pcm(self, samples, sample_rate: int, request_id: int = None) -> bool:
+        """Append a chunk to the open stream. Ignored (False) if the stream was stopped."""
+        if self._sink is None or not self._stream_open:
+            return False
+        if int(sample_rate) != self._sink_rate:
+            self.error.emit(f"Sample rate changed mid-stream: {sample_rate} != {self._sink_rate}")
+            return False
+        if tracing.ENABLED and request_id is not None:
+            if not self._trace_marks or self._trace_marks[-1][1] != request_id:
+                self._trace_marks.append((self._sink_fed + len(self._pending), request_id))
+        with tracing.span("pcm.encode", request=request_id):
+            self._pending += self._encode(samples)
+        self._pump()
+        return True
+
+    def continue_stream(self, sample_rate: int) -> bool:
+        """Keep appending to the current stream (open or still draining) so queued
+        utterances play back to back. False if there is none at this sample rate."""
+        if self._sink is None or int(sample_rate) != self._sink_rate:
+            return False
+        self._stream_open = True
+        return True
+
+    def end_stream(self):
+        """No more chunks; playback finishes once the queued audio drains."""
+        self._stream_open = False
+        self._check_drained()
+
     def stop(self):
         """Stop playback immediately"""
+        if self._sink is not None:
+            self._close_sink()
+            self.stopped.emit()
+            return
         if self._player.playbackState() != QMediaPlayer.PlaybackState.StoppedState:
             self._player.stop()
             self.stopped.emit()
@@ -58,15 +132,21 @@ class AudioController(QObject):
         """Set output volume 0..100."""
         v = max(0, min(100, int(vol)))
         self._audio.setVolume(v / 100.0)
+        if self._sink is not None:
+            self._sink.setVolume(v / 100.0)
 
     def set_rate(self, rate: float):
         """Set playback rate (speed). Common 0.5..0.2."""
+        self._rate = float(rate)
         try:
             self._player.setPlaybackRate(float(rate))
         except Exception:
             pass
 
     def is_playing(self) -> bool:
+        if self._sink is not None:
+            # An open sink may have drained (idle) while the stream waits for more chunks
+            return bool(self._pending) or self._sink.state() == QAudio.State.ActiveState
         return self._player.playbackState() == QMediaPlayer.PlaybackState.PlayingState
     
     def current_path(self) -> str:
@@ -97,6 +177,85 @@ class AudioController(QObject):
         except Exception as e:
             self.error.emit(f"Could not remove temp file: {e}")
 
+    # In-memory playback
+    def _encode(self, samples) -> bytes:
+        # Speed/pitch for PCM is applied by resampling, like the player's rate does for files
+        return to_int16(change_rate(samples, self._rate)).tobytes()
+
+    def _open_sink(self, sample_rate: int) -> bool:
+        fmt = QAudioFormat()
+        fmt.setSampleRate(int(sample_rate))
+        fmt.setChannelCount(1)
+        fmt.setSampleFormat(QAudioFormat.SampleFormat.Int16)
+        device = QMediaDevices.defaultAudioOutput()
+        if not device.isFormatSupported(fmt):
+            self.error.emit(f"Audio device does not support {sample_rate} Hz mono 16-bit")
+            return False
+        self._sink = QAudioSink(device, fmt, self)
+        self._sink.setVolume(self._audio.volume())
+        self._sink.setBufferSize(int(sample_rate * 2 * SINK_BUFFER_S))
+        self._sink.stateChanged.connect(self._on_sink_state_changed)
+        self._sink_dev = self._sink.start()
+        self._sink_rate = int(sample_rate)
+        self._current_path = ""
+        self._pcm_started = False
+        self._sink_fed = 0
+        self._pump_timer.start()
+        return True
+
+    def _close_sink(self):
+        self._pump_timer.stop()
+        self._pending.clear()
+        self._trace_marks.clear()
+        self._stream_open = False
+        sink, self._sink, self._sink_dev = self._sink, None, None
+        if sink is not None:
+            try:
+                sink.stateChanged.disconnect(self._on_sink_state_changed)
+            except Exception:
+                pass
+            sink.stop()
+            sink.deleteLater()
+
+    def _pump(self):
+        if self._sink is None or self._sink_dev is None:
+            return
+        free = self._sink.bytesFree()
+        if free > 0 and self._pending:
+            n = min(free, len(self._pending))
+            n -= n % 2
+            if n:
+                written = self._sink_dev.write(bytes(self._pending[:n]))
+                if written > 0:
+                    del self._pending[:written]
+                    self._sink_fed += written
+                    while self._trace_marks and self._trace_marks[0][0] < self._sink_fed:
+                        tracing.instant("audio.first_write", request=self._trace_marks.pop(0)[1])
+        self._check_drained()
+
+    def _check_drained(self):
+        if self._sink is None or self._pending or self._stream_open:
+            return
+        if not self._sink_fed:
+            # Stream closed without any audio (e.g. synthesis failed)
+            self._close_sink()
+        elif self._pcm_started and self._sink.state() == QAudio.State.IdleState:
+            self._close_sink()
+            self.finished.emit("")
+
+    def _on_sink_state_changed(self, state):
+        if self._sink is None:
+            return
+        if state == QAudio.State.ActiveState and not self._pcm_started:
+            self._pcm_started = True
+            self.started.emit("")
+        elif state == QAudio.State.IdleState:
+            self._check_drained()
+        elif state == QAudio.State.StoppedState and self._sink.error() != QAudio.Error.NoError:
+            err = self._sink.error()
+            self._close_sink()
+            self.error.emit(f"Audio sink error: {err}")
+
     def _on_error(self, *args):
         try:
             msg = self._player.errorString()
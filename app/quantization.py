@@ -0,0 +1,149 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Optional int8 dynamic quantization for CPU inference (PyTorch backend).
+# Only nn.Linear layers are converted: dynamic quantization has no Conv kernels,
+# and weight-normed layers are left alone because their weight is recomputed every forward.
+
+import os
+import copy
+import json
+from pathlib import Path
+
+import numpy as np
+
+QUANT_STATE = "ajtts_int8.qsd" # not picked up by the *.pth / *.pt / *.onnx globs
+QUANT_META = "ajtts_int8.json"
+GUARD_MIN_SIMILARITY = float(os.environ.get("AJTTS_QUANT_MIN_SIMILARITY", "0.90"))
+GUARD_MAX_LENGTH_DIFF = 0.10
+
+GUARD_TEXTS = {
+    "en": ["The quick brown fox jumps over the lazy dog.",
+           "Please save your work before closing the application."],
+    "es": ["El veloz murciélago hindú comía feliz cardillo y kiwi.",
+           "Por favor, guarde su trabajo antes de cerrar la aplicación."],
+}
+
+def quantizable_layers(model) -> list[str]:
+    import torch
+    names = []
+    for name, m in model.named_modules():
+        if type(m) is torch.nn.Linear and not hasattr(m, "weight_g") and not hasattr(m, "parametrizations"):
+            names.append(name)
+    return names
+
+def _quantize(model, names):
+    import torch
+    from torch.ao.quantization import default_dynamic_qconfig, quantize_dynamic
+    qmodel = copy.deepcopy(model)
+    quantize_dynamic(qmodel, {n: default_dynamic_qconfig for n in names}, dtype=torch.qint8, inplace=True)
+    return qmodel.eval()
+
+def _swap_empty(model, names):
+    '''Replace Linear layers by empty dynamic-quantized ones, ready for load_state_dict'''
+    import torch
+    from torch.ao.nn.quantized.dynamic import Linear as QLinear
+    qmodel = copy.deepcopy(model)
+    for name in names:
+        parent_name, _, child = name.rpartition(".")
+        parent = qmodel.get_submodule(parent_name) if parent_name else qmodel
+        lin = getattr(parent, child)
+        setattr(parent, child, QLinear(lin.in_features, lin.out_features,
+                                       bias_=lin.bias is not None, dtype=torch.qint8))
+    return qmodel.eval()
+
+def spectral_similarity(a, b, n_fft: int = 1024, hop: int = 256) -> float:
+    '''Cosine similarity of log-magnitude spectrograms (lengths aligned to the shorter one)'''
+    n = min(len(a), len(b))
+    if n < n_fft:
+        return 0.0
+
+    def spec(x):
+        x = np.asarray(x[:n], dtype=np.float32)
+        frames = np.lib.stride_tricks.sliding_window_view(x, n_fft)[::hop] * np.hanning(n_fft)
+        return np.log1p(np.abs(np.fft.rfft(frames, axis=1)))
+
+    sa, sb = spec(a), spec(b)
+    num = (sa * sb).sum(axis=1)
+    den = np.linalg.norm(sa, axis=1) * np.linalg.norm(sb, axis=1) + 1e-9
+    return float((num / den).mean())
+
+def quality_guard(tts, model_fp32, model_int8, texts) -> dict:
+    '''Same seed, same text: int8 output must stay close to fp32'''
+    import torch
+    synth = tts.synthesizer
+    sims, len_diffs = [], []
+    try:
+        for text in texts:
+            outs = []
+            for model in (model_fp32, model_int8):
+                synth.tts_model = model
+                torch.manual_seed(0)
+                outs.append(np.asarray(tts.tts(text=text, split_sentences=False), dtype=np.float32))
+            sims.append(spectral_similarity(*outs))
+            len_diffs.append(abs(len(outs[0]) - len(outs[1])) / max(1, len(outs[0])))
+    finally:
+        synth.tts_model = model_fp32
+    ok = min(sims) >= GUARD_MIN_SIMILARITY and max(len_diffs) <= GUARD_MAX_LENGTH_DIFF
+    return {"ok": ok, "similarity": min(sims), "length_diff": max(len_diffs)}
+
+def _source_stamp(model_path) -> dict:
+    import torch
+    st = Path(model_path).stat()
+    return {"checkpoint": Path(model_path).name, "size": st.st_size,
+            "mtime": int(st.st_mtime), "torch": torch.__version__}
+
+def apply_int8(tts, model_path, config_path, lang: str = "en", log=None) -> dict:
+    '''Quantize tts.synthesizer.tts_model in place (if the guard allows). Returns an info dict'''
+    import torch
+    log = log or (lambda *_: None)
+    folder = Path(config_path).parent
+    state_path, meta_path = folder / QUANT_STATE, folder / QUANT_META
+    model = tts.synthesizer.tts_model
+    names = quantizable_layers(model)
+    if not names:
+        return {"quantized": False, "reason": "no quantizable layers"}
+
+    stamp = _source_stamp(model_path)
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        meta = {}
+
+    if meta.get("stamp") == stamp and meta.get("layers") == names:
+        if not meta.get("guard", {}).get("ok"):
+            return {"quantized": False, "reason": "quality guard failed earlier", **meta.get("guard", {})}
+        try:
+            # Cached: skip the conversion and the guard, just load the verified int8 weights
+            qmodel = _swap_empty(model, names)
+            result = qmodel.load_state_dict(torch.load(state_path, map_location="cpu", weights_only=True),
+                                            strict=False)
+            # strict=False covers the fp32 layers; every swapped-in QLinear must be filled
+            prefixes = tuple(f"{n}." for n in names)
+            missing = [k for k in result.missing_keys if k.startswith(prefixes)]
+            if missing:
+                raise ValueError(f"{len(missing)} quantized keys missing, e.g. {missing[0]}")
+            tts.synthesizer.tts_model = qmodel
+            return {"quantized": True, "cached": True, "layers": len(names), **meta["guard"]}
+        except Exception as e:
+            log(f"[int8] cached state unusable ({e}), re-quantizing")
+            state_path.unlink(missing_ok=True)
+
+    qmodel = _quantize(model, names)
+    guard = quality_guard(tts, model, qmodel, GUARD_TEXTS.get(lang, GUARD_TEXTS["en"]))
+    if guard["ok"]:
+        prefixes = tuple(f"{n}." for n in names)
+        qstate = {k: v for k, v in qmodel.state_dict().items() if k.startswith(prefixes)}
+        try:
+            tmp = state_path.with_name(state_path.name + ".tmp")
+            torch.save(qstate, tmp)
+            os.replace(tmp, state_path)
+        except OSError as e:
+            log(f"[int8] could not cache quantized weights: {e}")
+        tts.synthesizer.tts_model = qmodel
+    try:
+        meta_path.write_text(json.dumps({"stamp": stamp, "layers": names, "guard": guard}, indent=2))
+    except OSError:
+        pass
+    return {"quantized": guard["ok"], "cached": False, "layers": len(names), **guard}
@@ -0,0 +1,424 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Headless HTTP synthesis server (no Qt). Sentences from concurrent requests are grouped
+# into micro-batches (AquaTTS.synthesize_batch) under a small latency deadline.
+#
+#   python -m app.server --model tts_models/en/ljspeech/vits --port 5002
+#
+#   POST /synthesize  {"text": "...", "model": "...", "format": "wav"|"pcm", "stream": false}
+#   GET  /stats       queue depth, batch sizes, recent per-request timings
+#   GET  /health
+
+import sys
+import json
+import time
+import uuid
+import queue
+import struct
+import argparse
+import threading
+import collections
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from app.model_index import get_model_index
+from app.model_manager import normalize_model_name
+from app.tts_engine import BATCH_SIZE, logger, prepare_text, sentence_chunk, split_sentences
+from app.pcm import to_int16, wav_bytes
+
+BATCH_WINDOW_MS = 15 # how long the first queued sentence waits for company
+MAX_TEXT_CHARS = 20000
+RECENT_REQUESTS = 100
+
+class MicroBatcher:
+    '''One worker thread per engine: queued sentences -> synthesize_batch -> futures'''
+    def __init__(self, engine, batch_size: int = None, window_ms: float = BATCH_WINDOW_MS):
+        self.engine = engine
+        self.batch_size = max(1, batch_size or BATCH_SIZE)
+        self.window_s = window_ms / 1000.0
+        self._queue = queue.Queue()
+        self._stop = False
+        self._closed = False
+        self._submit_lock = threading.Lock()
+        self.batches = 0
+        self.sentences = 0
+        self._thread = threading.Thread(target=self._run, name="ajtts-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, sentence: str) -> Future:
+        '''Future of (chunk samples, enqueue time, batch start time)'''
+        f = Future()
+        with self._submit_lock:
+            if self._closed:
+                f.set_exception(RuntimeError(f"{self.engine.model_name} was unloaded"))
+            else:
+                self._queue.put((sentence, f, time.perf_counter()))
+        return f
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def close(self, wait: bool = True):
+        '''Sentences queued so far are still synthesized; later submits fail'''
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        if wait:
+            self._thread.join(timeout=5)
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        items = [first]
+        deadline = time.perf_counter() + self.window_s
+        while len(items) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._stop = True
+                break
+            items.append(item)
+        return items
+
+    def _run(self):
+        while not self._stop:
+            items = self._collect()
+            if not items:
+                break
+            items = [it for it in items if it[1].set_running_or_notify_cancel()]
+            if not items:
+                continue
+            started = time.perf_counter()
+            try:
+                wavs = self.engine.synthesize_batch([s for s, _, _ in items], self.batch_size)
+            except Exception as e:
+                for _, f, _ in items:
+                    f.set_exception(e)
+                continue
+            self.batches += 1
+            self.sentences += len(items)
+            sr = self.engine.sample_rate
+            for (_, f, queued), wav in zip(items, wavs):
+                f.set_result((sentence_chunk(wav, sr), queued, started))
+
+def installed_model(model_name: str) -> bool:
+    '''Catalog id ("tts_models/<lang>/<dataset>/<model>", no paths) with weights on disk.
+    Anything else could make the pool download or open arbitrary paths'''
+    parts = model_name.split("/")
+    if len(parts) != 4 or parts[0] != "tts_models":
+        return False
+    if any(p in ("", ".", "..") or "\\" in p for p in parts):
+        return False
+    _folder, entry = get_model_index().lookup(normalize_model_name(model_name))
+    return bool(entry and entry["config"] and entry["weights"])
+
+class SynthesisService:
+    '''Engines (through a ModelPool), one MicroBatcher each, and request statistics'''
+    def __init__(self, default_model: str, batch_size: int = None, window_ms: float = BATCH_WINDOW_MS,
+                 pool=None):
+        if pool is None:
+            from app.model_pool import ModelPool
+            pool = ModelPool()
+        self.pool = pool
+        self.default_model = default_model
+        self.batch_size = batch_size
+        self.window_ms = window_ms
+        self._batchers = {} # pool key -> MicroBatcher
+        self._lock = threading.Lock()
+        if hasattr(pool, "add_evict_listener"):
+            # An evicted engine must not stay alive in its batcher thread
+            pool.add_evict_listener(self._on_evicted)
+        self.started = time.time()
+        self.requests = 0
+        self.active = 0
+        self.recent = collections.deque(maxlen=RECENT_REQUESTS)
+
+    def accepts_model(self, model_name) -> bool:
+        '''Models a client may name: the server's default voice or an installed catalog id'''
+        return model_name in (None, "", self.default_model) or installed_model(str(model_name))
+
+    def batcher(self, model_name: str = None) -> MicroBatcher:
+        from app.model_pool import pool_key
+
+        model_name = model_name or self.default_model
+        key = pool_key(model_name)
+        engine = self.pool.get(model_name)
+        stale = None
+        with self._lock:
+            b = self._batchers.get(key)
+            if b is None or b.engine is not engine:
+                stale = b
+                b = self._batchers[key] = MicroBatcher(engine, self.batch_size, self.window_ms)
+        if stale is not None:
+            stale.close(wait=False)
+        return b
+
+    def _on_evicted(self, key, engine):
+        with self._lock:
+            b = self._batchers.get(key)
+            if b is None or b.engine is not engine:
+                return
+            del self._batchers[key]
+        b.close(wait=False)
+
+    def synthesize(self, text: str, model_name: str = None, normalize: bool = True, timing: dict = None):
+        '''Yields (chunk samples, sample_rate) per sentence, in order; timings go into `timing`'''
+        timing = timing if timing is not None else {}
+        timing.update(id=uuid.uuid4().hex[:12], model=model_name or self.default_model, chars=len(text))
+        t0 = time.perf_counter()
+        with self._lock:
+            self.requests += 1
+            self.active += 1
+        try:
+            b = self.batcher(model_name)
+            timing["load_ms"] = _ms(time.perf_counter() - t0)
+            if normalize:
+                text = prepare_text(text, b.engine.model_name)
+            sentences = split_sentences(text)
+            if not sentences:
+                raise ValueError("Empty text")
+            timing["sentences"] = len(sentences)
+            futures = [b.submit(s) for s in sentences] # all queued at once -> batchable
+            sr = b.engine.sample_rate
+            queue_ms = 0.0
+            samples = 0
+            try:
+                for i, f in enumerate(futures):
+                    chunk, queued, started = f.result()
+                    queue_ms = max(queue_ms, _ms(started - queued))
+                    samples += len(chunk)
+                    if i == 0:
+                        timing["first_chunk_ms"] = _ms(time.perf_counter() - t0)
+                    yield chunk, sr
+            finally:
+                # Client gone / a chunk failed: the batcher skips cancelled sentences
+                for f in futures:
+                    f.cancel()
+            timing["queue_ms"] = queue_ms
+            timing["total_ms"] = _ms(time.perf_counter() - t0)
+            timing["audio_s"] = round(samples / float(sr), 3)
+            timing["rtf"] = round(timing["total_ms"] / 1000.0 / max(timing["audio_s"], 1e-6), 4)
+        except Exception as e:
+            timing["error"] = str(e)
+            raise
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.recent.append(timing)
+
+    def stats(self) -> dict:
+        with self._lock:
+            batchers = list(self._batchers.values())
+            recent = list(self.recent)
+        done = [t for t in recent if "total_ms" in t]
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "active": self.active,
+            "queue_depth": sum(b.depth() for b in batchers),
+            "engines": [{
+                "model": b.engine.model_name,
+                "info": getattr(b.engine, "loaded_info", b.engine.model_name),
+                "queue_depth": b.depth(),
+                "batches": b.batches,
+                "avg_batch": round(b.sentences / b.batches, 2) if b.batches else 0.0,
+            } for b in batchers],
+            "pool": self.pool.stats() if hasattr(self.pool, "stats") else None,
+            "latency_ms": _percentiles([t["total_ms"] for t in done]),
+            "first_chunk_ms": _percentiles([t["first_chunk_ms"] for t in done]),
+            "recent": recent[-20:],
+        }
+
+    def close(self):
+        with self._lock:
+            batchers, self._batchers = list(self._batchers.values()), {}
+        for b in batchers:
+            b.close()
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000.0, 2)
+
+def _percentiles(values) -> dict:
+    if not values:
+        return {}
+    a = np.asarray(values, dtype=np.float64)
+    return {"p50": round(float(np.percentile(a, 50)), 2),
+            "p95": round(float(np.percentile(a, 95)), 2),
+            "max": round(float(a.max()), 2)}
+
+def wav_stream_header(sample_rate: int) -> bytes:
+    '''WAV header with "unknown" sizes, for streamed 16-bit mono PCM'''
+    sr = int(sample_rate)
+    return (b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVEfmt "
+            + struct.pack("<IHHIIHH", 16, 1, 1, sr, sr * 2, 2, 16)
+            + b"data" + struct.pack("<I", 0xFFFFFFFF))
+
+class SynthesisHandler(BaseHTTPRequestHandler):
+    server_version = "ajtts"
+    protocol_version = "HTTP/1.1" # needed for chunked responses
+    service: SynthesisService = None
+
+    def log_message(self, fmt, *args):
+        logger.info("[server] %s - %s", self.address_string(), fmt % args)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._send_json({"ok": True})
+        elif path == "/stats":
+            self._send_json(self.service.stats())
+        elif path == "/synthesize":
+            params = {k: v[-1] for k, v in parse_qs(urlparse(self.path).query).items()}
+            self._synthesize(params)
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/synthesize":
+            self._send_json({"error": "not found"}, 404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                params = json.loads(body or b"{}")
+            except ValueError:
+                self._send_json({"error": "invalid JSON"}, 400)
+                return
+        else:
+            params = {"text": body.decode("utf-8", "replace")}
+        params.update({k: v[-1] for k, v in parse_qs(urlparse(self.path).query).items()})
+        self._synthesize(params)
+
+    def _synthesize(self, params: dict):
+        text = str(params.get("text") or "")
+        fmt = str(params.get("format", "wav")).lower()
+        stream = _flag(params.get("stream", False))
+        normalize = _flag(params.get("normalize", True))
+        if not text.strip():
+            self._send_json({"error": "empty text"}, 400)
+            return
+        if len(text) > MAX_TEXT_CHARS:
+            self._send_json({"error": f"text longer than {MAX_TEXT_CHARS} chars"}, 413)
+            return
+        if fmt not in ("wav", "pcm"):
+            self._send_json({"error": "format must be wav or pcm"}, 400)
+            return
+        if not self.service.accepts_model(params.get("model")):
+            self._send_json({"error": "model must be an installed model id"}, 400)
+            return
+
+        timing = {}
+        chunks = self.service.synthesize(text, params.get("model"), normalize, timing)
+        try:
+            first, sr = next(chunks) # surfaces load/normalization errors before any header
+        except Exception as e:
+            self._send_json({"error": str(e)}, 400 if isinstance(e, ValueError) else 500)
+            return
+
+        ctype = "audio/wav" if fmt == "wav" else f"audio/L16; rate={sr}; channels=1"
+        if stream:
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.send_header("X-Sample-Rate", str(sr))
+            self.send_header("X-Request-Id", timing["id"])
+            self.end_headers()
+            try:
+                if fmt == "wav":
+                    self._write_chunk(wav_stream_header(sr))
+                self._write_chunk(to_int16(first).tobytes())
+                for chunk, _ in chunks:
+                    self._write_chunk(to_int16(chunk).tobytes())
+                self._write_chunk(b"")
+            except (BrokenPipeError, ConnectionResetError):
+                chunks.close() # client went away
+                self.close_connection = True
+            except Exception as e:
+                # Headers are out: no terminating chunk, so the client sees a truncated body
+                logger.warning("[server] %s failed mid-stream: %s", timing.get("id"), e)
+                chunks.close()
+                self.close_connection = True
+            return
+
+        try:
+            samples = np.concatenate([first] + [c for c, _ in chunks])
+        except Exception as e:
+            chunks.close()
+            self._send_json({"error": str(e)}, 500)
+            return
+        body = wav_bytes(samples, sr) if fmt == "wav" else to_int16(samples).tobytes()
+        t = timing
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Sample-Rate", str(sr))
+        self.send_header("X-Request-Id", str(t.get("id", "")))
+        self.send_header("Server-Timing", ", ".join(
+            f"{k[:-3]};dur={t[k]}" for k in ("load_ms", "queue_ms", "first_chunk_ms", "total_ms") if k in t))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, obj, status: int = 200):
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def _flag(value) -> bool:
+    if isinstance(value, str):
+        return value.lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+def make_server(service: SynthesisService, host: str = "127.0.0.1", port: int = 5002):
+    handler = type("Handler", (SynthesisHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.server")
+    parser.add_argument("--model", default="tts_models/en/ljspeech/vits", help="default voice")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5002)
+    parser.add_argument("--batch-size", type=int, default=None, help=f"sentences per batch (default {BATCH_SIZE})")
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW_MS)
+    parser.add_argument("--no-preload", action="store_true", help="load the default voice on first request")
+    args = parser.parse_args(argv)
+
+    service = SynthesisService(args.model, args.batch_size, args.batch_window_ms)
+    if not args.no_preload:
+        print(f"Loading {args.model}...", file=sys.stderr)
+        service.batcher(args.model).engine.warm_up()
+    server = make_server(service, args.host, args.port)
+    print(f"Listening on http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
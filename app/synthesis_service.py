@@ -0,0 +1,193 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Persistent synthesis thread for the GUI: one worker, one prioritized work queue.
+# - interactive requests (Speak/Repeat) run before bulk ones
+# - a text that is already pending is not queued twice (coalescing)
+# - requests with a replace_key drop older pending ones with the same key (clipboard spam)
+# Text repair/normalization also runs here, off the GUI thread.
+
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass
+
+from PySide6.QtCore import QObject, Signal
+
+from app import tracing
+
+INTERACTIVE = 0
+BULK = 10
+
+@dataclass
+class SpeechRequest:
+    text: str
+    engine: object
+    priority: int = INTERACTIVE
+    prepare: bool = False # repair + normalize for the engine's language before synthesis
+    streaming: bool = True
+    replace_key: str = None
+    id: int = 0
+    cancel: object = None # CancelToken, created on submit
+    submitted: float = 0.0 # perf_counter() at submit (queue wait span)
+    generation: int = 0 # SpeechService generation at submit; cancel_all() bumps it
+
+    def coalesce_key(self):
+        return (id(self.engine), self.text, self.prepare)
+
+class SpeechQueue:
+    '''Priority queue (FIFO within a priority) with coalescing and replace-latest'''
+    def __init__(self):
+        self._heap = [] # (priority, seq, request)
+        self._pending = {} # request id -> request
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.coalesced = 0
+        self.replaced = 0
+
+    def put(self, req: SpeechRequest) -> int:
+        '''Queue req; returns its id (or the id of the identical request already pending)'''
+        with self._cond:
+            key = req.coalesce_key()
+            for other in self._pending.values():
+                if other.coalesce_key() == key:
+                    self.coalesced += 1
+                    if req.priority < other.priority:
+                        # Same text asked for interactively: move it up
+                        other.priority = req.priority
+                        heapq.heappush(self._heap, (other.priority, next(self._seq), other))
+                    return other.id
+            if req.replace_key is not None:
+                for other in [o for o in self._pending.values() if o.replace_key == req.replace_key]:
+                    del self._pending[other.id]
+                    self.replaced += 1
+            req.id = next(self._ids)
+            self._pending[req.id] = req
+            heapq.heappush(self._heap, (req.priority, next(self._seq), req))
+            self._cond.notify()
+            return req.id
+
+    def get(self):
+        '''Next request, blocking; None once closed'''
+        with self._cond:
+            while True:
+                while self._heap:
+                    priority, _, req = heapq.heappop(self._heap)
+                    # Skip entries dropped (replaced/cleared) or superseded by a re-push
+                    if self._pending.get(req.id) is req and req.priority == priority:
+                        del self._pending[req.id]
+                        return req
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def clear(self) -> int:
+        with self._cond:
+            n = len(self._pending)
+            self._pending.clear()
+            self._heap.clear()
+            return n
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._pending)
+
+class SpeechService(QObject):
+    '''Lives in its own QThread; run() loops over the queue until shutdown()'''
+    progress = Signal(str)
+    started = Signal(int, str, int) # request id, text being spoken, sample rate
+    chunk_pcm = Signal(int, object, int) # request id, samples, sample rate
+    finished = Signal(int, bool) # request id, completed (False: error/cancelled)
+    idle = Signal() # queue drained
+    queue_changed = Signal(int) # pending requests
+
+    def __init__(self):
+        super().__init__()
+        self.queue = SpeechQueue()
+        self._current = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    # Any thread
+    def submit(self, text: str, engine, priority: int = INTERACTIVE, prepare: bool = False,
+               streaming: bool = True, replace_key: str = None) -> int:
+        from app.tts_engine import CancelToken
+
+        with self._lock:
+            generation = self._generation
+        req = SpeechRequest(text, engine, priority, prepare, streaming, replace_key,
+                            cancel=CancelToken(), submitted=tracing.now(), generation=generation)
+        req_id = self.queue.put(req)
+        self.queue_changed.emit(len(self.queue))
+        return req_id
+
+    def cancel_all(self) -> int:
+        '''Drop everything pending and abort the request being synthesized'''
+        with self._lock:
+            # Also catches a request dequeued but not yet marked current
+            self._generation += 1
+            current = self._current
+        dropped = self.queue.clear()
+        if current is not None:
+            current.cancel.set()
+        self.queue_changed.emit(0)
+        return dropped
+
+    def shutdown(self):
+        self.cancel_all()
+        self.queue.close()
+
+    # Worker thread
+    def run(self):
+        while True:
+            req = self.queue.get()
+            if req is None:
+                break
+            self.queue_changed.emit(len(self.queue))
+            with self._lock:
+                self._current = req
+                if req.generation != self._generation:
+                    req.cancel.set() # submitted before a cancel_all()
+            try:
+                with tracing.request(req.id):
+                    tracing.complete("queue.wait", req.submitted, tracing.now())
+                    with tracing.span("speak.request", priority=req.priority):
+                        ok = self._speak(req)
+                self.finished.emit(req.id, ok)
+            finally:
+                with self._lock:
+                    self._current = None
+            if not len(self.queue):
+                self.idle.emit()
+
+    def _speak(self, req: SpeechRequest) -> bool:
+        from app.tts_engine import SynthesisCancelled, prepare_text
+
+        engine = req.engine
+        try:
+            text = prepare_text(req.text, engine.model_name) if req.prepare else req.text
+            if not text.strip() or req.cancel.is_set():
+                return False
+            sr = engine.sample_rate
+            self.started.emit(req.id, text, sr)
+            self.progress.emit("Synthesizing...")
+            if req.streaming:
+                for samples, sample_rate in engine.iter_pcm_chunks(text, cancel=req.cancel):
+                    self.chunk_pcm.emit(req.id, samples, sample_rate)
+            else:
+                samples, sample_rate = engine.synthesize_to_pcm(text, cancel=req.cancel)
+                self.chunk_pcm.emit(req.id, samples, sample_rate)
+            return not req.cancel.is_set()
+        except SynthesisCancelled:
+            return False
+        except Exception as e:
+            self.progress.emit(f"Error: {e}")
+            return False
@@ -0,0 +1,122 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# CPU threading / affinity for the engine.
+# torch's intra-op and interop pools are process-wide: engines that must not share
+# cores should live in separate processes (see app.parallel).
+
+import os
+import json
+import logging
+
+logger = logging.getLogger("ajtts")
+
+def parse_cpu_list(spec: str) -> set[int]:
+    '''"0-3,8,10-11" -> {0, 1, 2, 3, 8, 10, 11}'''
+    cpus = set()
+    for part in (spec or "").replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            cpus.update(range(int(lo), int(hi) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+def format_cpu_list(cpus) -> str:
+    out, run = [], []
+    for c in sorted(cpus):
+        if run and c == run[-1] + 1:
+            run.append(c)
+            continue
+        if run:
+            out.append(f"{run[0]}-{run[-1]}" if len(run) > 1 else str(run[0]))
+        run = [c]
+    if run:
+        out.append(f"{run[0]}-{run[-1]}" if len(run) > 1 else str(run[0]))
+    return ",".join(out)
+
+class ThreadConfig:
+    def __init__(self, intra_op: int = None, interop: int = None, cpus=None):
+        self.intra_op = int(intra_op) if intra_op else None
+        self.interop = int(interop) if interop else None
+        self.cpus = set(cpus) if cpus else None
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        '''Keys as in config.json: intra_op_threads, interop_threads, cpu_affinity ("0-3")'''
+        d = d or {}
+        cpus = d.get("cpu_affinity")
+        if isinstance(cpus, str):
+            cpus = parse_cpu_list(cpus)
+        return cls(d.get("intra_op_threads"), d.get("interop_threads"), cpus)
+
+    @classmethod
+    def from_env(cls, base=None):
+        '''AJTTS_INTRA_THREADS / AJTTS_INTEROP_THREADS / AJTTS_CPU_AFFINITY override base'''
+        base = base or cls()
+        env = os.environ
+        cpus = parse_cpu_list(env["AJTTS_CPU_AFFINITY"]) if env.get("AJTTS_CPU_AFFINITY") else base.cpus
+        return cls(env.get("AJTTS_INTRA_THREADS") or base.intra_op,
+                   env.get("AJTTS_INTEROP_THREADS") or base.interop,
+                   cpus)
+
+    @classmethod
+    def load(cls, path: str = None):
+        '''App config (user_data/config.json) with the AJTTS_* env vars on top'''
+        from app.config import CONFIG_PATH
+        path = path or CONFIG_PATH
+        data = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning("[threads] ignoring %s: %s", path, e)
+        return cls.from_env(cls.from_dict(data))
+
+    def __repr__(self):
+        cpus = format_cpu_list(self.cpus) if self.cpus else None
+        return f"ThreadConfig(intra_op={self.intra_op}, interop={self.interop}, cpus={cpus})"
+
+def _set_affinity(cpus):
+    # sched_setaffinity(0) only covers the calling thread: apply to every thread already
+    # running so torch/Qt pools created earlier follow too; new threads inherit it.
+    tids = [0]
+    try:
+        tids = [int(t) for t in os.listdir("/proc/self/task")]
+    except OSError:
+        pass
+    for tid in tids:
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except OSError:
+            pass
+
+def apply_thread_config(cfg: ThreadConfig) -> dict:
+    '''Apply what cfg sets, leave the rest alone. Returns the effective settings'''
+    import torch
+
+    if cfg.cpus and hasattr(os, "sched_setaffinity"):
+        _set_affinity(cfg.cpus)
+    if cfg.intra_op:
+        torch.set_num_threads(cfg.intra_op)
+    if cfg.interop and torch.get_num_interop_threads() != cfg.interop:
+        try:
+            torch.set_num_interop_threads(cfg.interop)
+        except RuntimeError as e:
+            # Only allowed before the first parallel op in the process
+            logger.warning("[threads] interop threads stay at %d: %s", torch.get_num_interop_threads(), e)
+
+    try:
+        cpus = sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = list(range(os.cpu_count() or 1))
+    return {
+        "intra_op": torch.get_num_threads(),
+        "interop": torch.get_num_interop_threads(),
+        "cpus": format_cpu_list(cpus),
+    }
@@ -0,0 +1,195 @@
+# AquaJupiterTTS
+# Copyright (C) 2025  AzuDevCR (INL Creations)
+# Licensed under GPLv3 (see LICENSE file for details).
+
+# Per-stage latency spans for the speak pipeline (repair, normalize, phonemize, model
+# stages, vocoder, PCM, audio start), tagged with the request id.
+#
+#   AJTTS_TRACE=1                 record; Chrome trace written at exit to TRACE_FILE
+#   AJTTS_TRACE=/tmp/speak.json   same, to that file (open in chrome://tracing / Perfetto)
+#
+# Disabled (the default), span() returns a shared no-op context and no hooks are installed.
+
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+import collections
+import contextvars
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+logger = logging.getLogger("ajtts")
+
+_SETTING = os.environ.get("AJTTS_TRACE", "").strip()
+ENABLED = _SETTING not in ("", "0", "false", "off")
+TRACE_FILE = Path(_SETTING) if _SETTING.endswith(".json") else \
+    Path.home() / ".local" / "share" / "tts" / "ajtts_trace.json"
+MAX_EVENTS = int(os.environ.get("AJTTS_TRACE_EVENTS", "100000"))
+
+_NOOP = nullcontext()
+_T0 = time.perf_counter()
+_events = collections.deque(maxlen=MAX_EVENTS)
+_listeners = []
+_request = contextvars.ContextVar("ajtts_request", default=None)
+
+def now() -> float:
+    return time.perf_counter()
+
+def current_request():
+    return _request.get()
+
+@contextmanager
+def _request_scope(request_id):
+    token = _request.set(request_id)
+    try:
+        yield
+    finally:
+        _request.reset(token)
+
+def request(request_id):
+    '''Spans opened inside (same thread) are tagged with request_id'''
+    return _request_scope(request_id) if ENABLED else _NOOP
+
+@contextmanager
+def _span(name, args):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        complete(name, start, time.perf_counter(), **args)
+
+def span(name: str, **args):
+    '''with span("normalize"): ... -> one timed event (monotonic clock)'''
+    return _span(name, args) if ENABLED else _NOOP
+
+def complete(name: str, start: float, end: float, request=None, **args):
+    '''Record a span from explicit perf_counter() timestamps (e.g. queue wait)'''
+    if not ENABLED:
+        return
+    _record({
+        "name": name,
+        "ph": "X",
+        "ts": (start - _T0) * 1e6,
+        "dur": (end - start) * 1e6,
+        "tid": threading.get_ident(),
+        "request": request if request is not None else _request.get(),
+        "args": args,
+    })
+
+def instant(name: str, request=None, **args):
+    '''Point in time (e.g. first audio handed to the device)'''
+    if not ENABLED:
+        return
+    _record({
+        "name": name,
+        "ph": "i",
+        "ts": (time.perf_counter() - _T0) * 1e6,
+        "tid": threading.get_ident(),
+        "request": request if request is not None else _request.get(),
+        "args": args,
+    })
+
+def _record(event: dict):
+    _events.append(event)
+    for fn in list(_listeners):
+        try:
+            fn(event)
+        except Exception as e:
+            logger.warning("[trace] listener failed: %s", e)
+
+def add_listener(fn):
+    '''fn(event dict) for every recorded event, on the thread that recorded it'''
+    _listeners.append(fn)
+    return lambda: _listeners.remove(fn) if fn in _listeners else None
+
+def events(request=None) -> list:
+    evs = list(_events)
+    return evs if request is None else [e for e in evs if e["request"] == request]
+
+def clear():
+    _events.clear()
+
+def stage_summary(request) -> dict:
+    '''Total ms per span name for one request'''
+    out = collections.defaultdict(float)
+    for e in events(request):
+        if e["ph"] == "X":
+            out[e["name"]] += e["dur"] / 1000.0
+    return {k: round(v, 3) for k, v in out.items()}
+
+def export_chrome_trace(path=None) -> str:
+    '''Write the recorded events as Chrome trace-event JSON'''
+    path = Path(path or TRACE_FILE)
+    pid = os.getpid()
+    trace = []
+    for e in list(_events):
+        ev = {"name": e["name"], "cat": e["name"].split(".", 1)[0], "ph": e["ph"],
+              "ts": round(e["ts"], 3), "pid": pid, "tid": e["tid"],
+              "args": dict(e["args"], request=e["request"])}
+        if e["ph"] == "X":
+            ev["dur"] = round(e["dur"], 3)
+        else:
+            ev["s"] = "t"
+        trace.append(ev)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"}))
+    return str(path)
+
+def trace_module_stages(module, prefix: str, rename: dict = None):
+    '''Spans around forward() of each direct child of a torch module (model stages)'''
+    if not ENABLED or module is None:
+        return
+    rename = rename or {}
+    for child_name, child in module.named_children():
+        _trace_forward(child, rename.get(child_name, f"{prefix}.{child_name}"))
+
+def trace_forward(module, name: str):
+    if ENABLED and module is not None:
+        _trace_forward(module, name)
+
+def _trace_forward(module, name: str):
+    starts = threading.local()
+
+    def pre(_m, _inputs):
+        stack = getattr(starts, "stack", None)
+        if stack is None:
+            stack = starts.stack = []
+        stack.append(time.perf_counter())
+
+    def post(_m, _inputs, _output):
+        stack = getattr(starts, "stack", None)
+        if stack:
+            complete(name, stack.pop(), time.perf_counter())
+
+    module.register_forward_pre_hook(pre)
+    module.register_forward_hook(post)
+
+def trace_method(obj, attr: str, name: str):
+    '''Wrap obj.attr (e.g. tokenizer.text_to_ids) in a span'''
+    if not ENABLED or obj is None or not hasattr(obj, attr):
+        return
+    fn = getattr(obj, attr)
+
+    def traced(*args, **kwargs):
+        with _span(name, {}):
+            return fn(*args, **kwargs)
+    setattr(obj, attr, traced)
+
+def qt_bridge(parent=None):
+    '''QObject whose `event` signal re-emits every trace event on the Qt side'''
+    from PySide6.QtCore import QObject, Signal
+
+    class TraceBridge(QObject):
+        event = Signal(object)
+
+    bridge = TraceBridge(parent)
+    remove = add_listener(bridge.event.emit)
+    bridge.destroyed.connect(lambda *_: remove())
+    return bridge
+
+if ENABLED:
+    add_listener(lambda e: logger.info("[trace] %s", json.dumps(e, default=str)))
+    atexit.register(lambda: _events and logger.warning("[trace] written to %s", export_chrome_trace()))
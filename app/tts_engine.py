@@ -6,55 +6,66 @@
 import sys
 import logging
 import os
+import threading
 
 os.environ["PYTORCH_JIT"] = "0"
-try:
-    import typeguard
-    typeguard.typechecked = lambda *a, **k: (lambda f: f)
-except Exception:
-    pass
-try:
-    import typeguard._decorators as _dec
-    _dec.typechecked = lambda *a, **k: (lambda f: f)
-except Exception:
-    pass
 
 import re
+import time
 import tempfile
 import platform
 import shutil
 import subprocess
+import collections
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import torch, collections
-try:
-    from TTS.utils.radam import RAdam
-    torch.serialization.add_safe_globals([RAdam])
-except Exception:
-    pass
-
-try:
-    torch.serialization.add_safe_globals([collections.defaultdict])
-except Exception:
-    pass
+import numpy as np
 
 from pathlib import Path
-from TTS.api import TTS
-from TTS.utils.manage import ModelManager
 
 os.environ["COQUI_TOS_AGREED"] = "1"
 
 from glob import glob
 
+from app import tracing
+from app.audio_cache import cache_key, default_audio_cache
+from app.phoneme_cache import install_phoneme_cache
+from app.onnx_backend import OnnxVits, find_onnx, onnxruntime_available
+from app.quantization import apply_int8
+from app.mmap_weights import find_safetensors, is_fresh, load_mmap_tts
+from app.threads import ThreadConfig, apply_thread_config
+from app.model_manager import download_model
+from app.model_index import get_model_index
+from app.pcm import (
+    to_float32, to_int16, wav_bytes, write_wav, fade_edges, silence, trim_trailing_zeros
+)
+
 ASSETS_MODELS_DIR = Path(__file__).resolve().parent / "assets" / "models"
 CACHE_DIR = Path.home() / ".local" / "share" / "tts"
+SENTENCE_MAX_CHARS = 250 # longer sentences are split at commas/spaces
+SENTENCE_MIN_CHARS = 20 # shorter ones are merged with the next
+SENTENCE_PAUSE_S = 0.3 # silence between streamed sentences
+# auto: ONNX Runtime when model.onnx sits next to config.json, else PyTorch
+BACKEND = os.environ.get("AJTTS_BACKEND", "auto").lower()
+# int8 -> dynamic int8 quantization of Linear layers (PyTorch backend only)
+QUANTIZE = os.environ.get("AJTTS_QUANTIZE", "").lower()
+WARMUP_RUNS = int(os.environ.get("AJTTS_WARMUP_RUNS", "2")) # 0 disables the warm-up
+WARMUP_TEXTS = {
+    "en": ["Hello, this is a warm up.", "The quick brown fox jumps over the lazy dog, twice."],
+    "es": ["Hola, esto es un calentamiento.", "El veloz murciélago hindú comía feliz cardillo y kiwi."],
+}
+# Load model.safetensors (memory-mapped) instead of the .pth when it exists
+MMAP_WEIGHTS = os.environ.get("AJTTS_MMAP_WEIGHTS", "1") != "0"
+PRELOAD_WORKERS = int(os.environ.get("AJTTS_PRELOAD_WORKERS", "3")) # concurrent model downloads
+BATCH_SIZE = int(os.environ.get("AJTTS_BATCH_SIZE", "8")) # sentences per forward pass (VITS)
+_SENTENCE_END = re.compile(r"(?<=[.!?;…])\s+")
+
 _DIGITS_0_19 = ["zero","one","two","three","four","five","six","seven","eight","nine",
                 "ten","eleven","twelve","thirteen","fourteen","fifteen",
                 "sixteen","seventeen","eighteen","nineteen"]
 _TENS = {20:"twenty",30:"thirty",40:"forty",50:"fifty",60:"sixty",
          70:"seventy",80:"eighty",90:"ninety"}
 
-model_manager = ModelManager()
-
 logger = logging.getLogger("ajtts")
 if not logger.handlers:
     h = logging.StreamHandler(sys.stderr)
@@ -62,6 +73,86 @@ if not logger.handlers:
     logger.addHandler(h)
 logger.setLevel(logging.WARNING)
 
+_coqui_lock = threading.Lock()
+_coqui_ready = False
+
+class SynthesisCancelled(Exception):
+    pass
+
+class CancelToken(threading.Event):
+    '''Cooperative cancellation for one synthesis request. Checked between sentences and
+    batches, and before each stage of the model (encoder, flow, decoder, vocoder)'''
+    def __init__(self):
+        super().__init__()
+        self._callbacks = []
+        self._cb_lock = threading.Lock()
+
+    def set(self):
+        super().set()
+        with self._cb_lock:
+            callbacks, self._callbacks = self._callbacks, []
+        for cb in callbacks:
+            try:
+                cb()
+            except Exception as e:
+                logger.warning("[cancel] callback failed: %s", e)
+
+    cancel = set
+
+    def add_callback(self, cb):
+        '''Run cb() on cancel (right away if already cancelled). Returns a remover'''
+        with self._cb_lock:
+            if not self.is_set():
+                self._callbacks.append(cb)
+                return lambda: self._remove(cb)
+        cb()
+        return lambda: None
+
+    def _remove(self, cb):
+        with self._cb_lock:
+            if cb in self._callbacks:
+                self._callbacks.remove(cb)
+
+    def check(self):
+        if self.is_set():
+            raise SynthesisCancelled()
+
+def _cancelled(cancel) -> bool:
+    return cancel is not None and cancel.is_set()
+
+def _patch_typeguard():
+    try:
+        import typeguard
+        typeguard.typechecked = lambda *a, **k: (lambda f: f)
+    except Exception:
+        pass
+    try:
+        import typeguard._decorators as _dec
+        _dec.typechecked = lambda *a, **k: (lambda f: f)
+    except Exception:
+        pass
+
+def import_coqui():
+    '''torch + Coqui TTS, imported on first real use (seconds of work kept off startup)'''
+    global _coqui_ready
+    with _coqui_lock:
+        if not _coqui_ready:
+            _patch_typeguard()
+            import torch
+            try:
+                from TTS.utils.radam import RAdam
+                torch.serialization.add_safe_globals([RAdam])
+            except Exception:
+                pass
+
+            try:
+                torch.serialization.add_safe_globals([collections.defaultdict])
+            except Exception:
+                pass
+            _coqui_ready = True
+    from TTS.api import TTS
+    return TTS
+
 def safe_normalize(func, text, *args, **kwargs):
     try:
         return func(text, *args, **kwargs)
@@ -119,12 +210,8 @@ def _cache_dir(model_id: str) -> Path:
     return (CACHE_DIR / _norm(model_id))
 
 def _has_weights(folder: Path) -> bool:
-    if not folder.exists():
-        return False
-    
-    has_cfg = (folder / "config.json").exists()
-    has_w = any(folder.glob("*.pth")) or any(folder.glob("*.pt")) or any(folder.glob("*.onnx"))
-    return has_cfg and has_w
+    entry = get_model_index().entry(folder)
+    return bool(entry and entry["config"] and entry["weights"])
 
 def _copy_model_tree(src: Path, dst: Path):
     # dst.mkdir(parents=True, exist_ok=True)
@@ -144,13 +231,14 @@ def _copy_model_tree(src: Path, dst: Path):
         if f.exists():
             shutil.copy2(f, dst / f.name)
     # pesos y extras comunes
-    for pat in ("*.pth", "*.pt", "*.onnx", "vocoder*.pth", "*.json", "*.txt"):
+    for pat in ("*.pth", "*.pt", "*.onnx", "*.safetensors", "vocoder*.pth", "*.json", "*.txt"):
         for f in src.glob(pat):
             if f.name == "config.json":  # ya copiada
                 continue
             shutil.copy2(f, dst / f.name)
 
-def ensure_model_local(model_id: str, log=None):
+def ensure_model_local(model_id: str, log=None, downloader=None):
+    '''downloader(model_id) fetches into the cache; defaults to app.downloader (resumable)'''
     log = log or (lambda *_: None)
     cdir = _cache_dir(model_id)
     if _has_weights(cdir):
@@ -158,14 +246,40 @@ def ensure_model_local(model_id: str, log=None):
         return True
     log(f"Downloading: {model_id}")
     os.environ["COQUI_TOS_AGREED"] = "1"
-    model_manager.download_model(model_id)
+    # force: a folder without weights (interrupted download) must be re-fetched
+    (downloader or (lambda m: download_model(m, log=log, force=True)))(model_id)
+    get_model_index().invalidate(cdir)
     return _has_weights(cdir)
 
-def ensure_preinstalled_models(models: list[str], log=None):
+def ensure_preinstalled_models(models: list[str], log=None, on_ready=None,
+                               max_workers: int = None, downloader=None):
+    '''Prepare models concurrently (submitted in list order). on_ready(model_id, ok) per model;
+    models[0] (the default voice) is always reported first, the others as soon as possible after'''
+    log = log or (lambda *_: None)
+    if not models:
+        return True
+    workers = max(1, min(len(models), max_workers or PRELOAD_WORKERS))
     ok_all = True
-    for m in models:
-        ok = ensure_model_local(m, log=log)
-        ok_all = ok_all and ok
+    held = [] # finished before models[0]; None once it has been reported
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ajtts-preload") as pool:
+        futures = {pool.submit(ensure_model_local, m, log, downloader): m for m in models}
+        for f in as_completed(futures):
+            m = futures[f]
+            try:
+                ok = bool(f.result())
+            except Exception as e:
+                log(f"Failed: {m} ({e})")
+                ok = False
+            ok_all = ok_all and ok
+            if not on_ready:
+                continue
+            if held is not None and m != models[0]:
+                held.append((m, ok))
+                continue
+            on_ready(m, ok)
+            for item in held or ():
+                on_ready(*item)
+            held = None
     return ok_all
 
 def _normalize_name(model_id: str) -> str:
@@ -175,61 +289,94 @@ def resolve_model(id_or_path: str):
     p = Path(id_or_path)
     if p.exists():
         return _find_paths_in(p)
-    
-    # 1- assets
-    folder =  ASSETS_MODELS_DIR / _normalize_name(id_or_path)
-    if folder.exists():
-        return _find_paths_in(folder)
-    
-    # 2- cache (~/.local/share/tts/...)
-    cfolder = CACHE_DIR / _normalize_name(id_or_path)
-    if cfolder.exists():
-        return _find_paths_in(cfolder)
-    
+
+    # 1- assets, 2- cache (~/.local/share/tts/...); one index lookup instead of globbing
+    index = get_model_index()
+    folder, entry = index.lookup(_normalize_name(id_or_path))
+    if folder is not None:
+        return index.paths(folder, entry)
+
     return (None, None)
 
 def _find_paths_in(folder: Path):
-    model_path = None
-    for pat in ("*.pth","*.pt","*.onnx"):
-        hits = list(folder.glob(pat))
-        if hits:
-            model_path = hits[0]
-            break
-    config_path = folder / "config.json" if (folder / "config.json").exists() else None
-    return (model_path, config_path)
+    return get_model_index().paths(Path(folder))
 
 # TEMP_AUDIO_DIR = Path(__file__).parent / ".." / "output" / "tmp"
 # TEMP_AUDIO_DIR.mkdir(parents=True, exist_ok=True)
 
+def _warn_missing_espeak():
+    msg = ("This model may require 'espeak-ng' o 'espeak'.\n"
+           "Install it with:\n\nsudo apt install espeak-ng espeak")
+    # Only pop a dialog from the GUI thread of a running Qt app (never in workers/headless)
+    qtw = sys.modules.get("PySide6.QtWidgets")
+    app = qtw.QApplication.instance() if qtw else None
+    if app is not None and threading.current_thread() is threading.main_thread():
+        qtw.QMessageBox.critical(None, "Missing Dependency", msg)
+    else:
+        logger.warning(msg)
+
+def sentence_chunk(samples, sample_rate: int):
+    '''One synthesized sentence -> chunk that joins its neighbours without gaps or clicks'''
+    wav = trim_trailing_zeros(samples)
+    return np.concatenate([fade_edges(wav, sample_rate), silence(sample_rate, SENTENCE_PAUSE_S)])
+
+def _model_identity(model_name: str, model_path, config_path) -> str:
+    '''Resolved weights path + config hash; changes whenever the voice on disk changes'''
+    if not (model_path and config_path):
+        return model_name
+    cfg_hash = get_model_index().content_hash(Path(config_path))[:16]
+    return f"{Path(model_path).resolve()}#{cfg_hash}"
+
+def torch_tts(model_path, config_path):
+    '''Coqui TTS (PyTorch) for a local checkpoint + config'''
+    TTS = import_coqui()
+    return TTS(
+        model_path=str(model_path),
+        config_path=str(config_path),
+        progress_bar=False,
+        gpu=False
+    )
+
 class AquaTTS:
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, audio_cache=None, backend: str = None, quantize: str = None,
+                 threads: ThreadConfig = None):
         if not shutil.which("espeak-ng") and not shutil.which("espeak"):
-            from PySide6.QtWidgets import QMessageBox
-            QMessageBox.critical(
-                None,
-                "Missing Dependency",
-                "This model may require 'espeak-ng' o 'espeak'.\n"
-                "Install it with:\n\nsudo apt install espeak-ng espeak"
-            )
+            _warn_missing_espeak()
 
         self.model_name = model_name
         self.last_text = None
+        self._lock = threading.RLock() # one forward pass at a time (warm-up vs. speak)
+        self._cancel = None # token of the forward pass holding _lock
+        self.warmup_stats = None
 
         model_path, config_path = resolve_model(model_name)
+        self.identity = _model_identity(model_name, model_path, config_path)
+        # None -> shared default cache, False -> no cache
+        self.audio_cache = default_audio_cache() if audio_cache is None else (audio_cache or None)
+
+        import_coqui()
+
+        # Threads/affinity before the model spins up any pool
+        self.thread_config = threads if threads is not None else ThreadConfig.load()
+        self.threads = apply_thread_config(self.thread_config)
+
+        self.tts = None
+        self.onnx = None
+        self.backend = "torch"
+        self.weights = "pth"
+        backend = (backend or BACKEND).lower()
+        onnx_path = find_onnx(config_path) if backend != "torch" else None
+        if backend == "onnx" and onnx_path is None:
+            logger.warning("[onnx] no ONNX graph for %s, using PyTorch", model_name)
 
         try:
-            if model_path and config_path:
-                self.tts = TTS(
-                    model_path=str(model_path),
-                    config_path=str(config_path),
-                    progress_bar=False,
-                    gpu=False
-                )
-                src_root = Path(model_path).parent
-                self.source = "cache" if str(src_root).startswith(str(CACHE_DIR)) else "local"
+            if onnx_path is not None and onnxruntime_available():
+                self.onnx = OnnxVits(onnx_path, config_path, threads=self.thread_config.intra_op)
+                self.backend = "onnx"
+            elif model_path and config_path:
+                self.tts = self._load_torch(model_path, config_path)
             else:
-                self.tts = TTS(model_name=model_name, progress_bar=False, gpu=False)
-                self.source = "remote"
+                self.tts = import_coqui()(model_name=model_name, progress_bar=False, gpu=False)
         except Exception as e:
             if "No espeak backend found" in str(e):
                 raise RuntimeError(
@@ -239,67 +386,358 @@ class AquaTTS:
             else:
                 raise
 
-        self.loaded_info = f"{self.model_name} [{self.source}]"
-
-        try:
-            if not hasattr(self.tts, "is_multi_lingual"):
-                self.tts.__class__.is_multi_lingual = property(lambda _self: False)
-            if not hasattr(self.tts, "speakers"):
-                self.tts.__class__.speakers = property(lambda _self: None)
-        except Exception:
-            pass
+        self.quantization = None
+        quantize = (QUANTIZE if quantize is None else quantize or "").lower()
+        if quantize == "int8" and self.tts is not None and model_path and config_path:
+            lang = "es" if "/es/" in model_name else "en"
+            info = apply_int8(self.tts, model_path, config_path, lang=lang, log=logger.warning)
+            if info.get("quantized"):
+                self.quantization = "int8"
+            else:
+                logger.warning("[int8] keeping fp32 for %s: %s", model_name, info)
 
-        
+        if model_path and config_path:
+            src_root = Path(config_path).parent
+            self.source = "cache" if str(src_root).startswith(str(CACHE_DIR)) else "local"
+        else:
+            self.source = "remote"
 
         self.loaded_info = f"{self.model_name} [{self.source}]"
 
-    def synthesize_to_wav(self, text: str) -> str:
-        """Returns a temporal WAV(path) with the speech do not talk"""
-        if not text:
-            raise ValueError("Empty text")
-        self.last_text = text
-
-        tmp = tempfile.NamedTemporaryFile(prefix="ajtts_", suffix=".wav", delete=False)
-        tmp_path = Path(tmp.name)
-        tmp.close()
-
+        if self.tts is not None:
+            try:
+                if not hasattr(self.tts, "is_multi_lingual"):
+                    self.tts.__class__.is_multi_lingual = property(lambda _self: False)
+                if not hasattr(self.tts, "speakers"):
+                    self.tts.__class__.speakers = property(lambda _self: None)
+            except Exception:
+                pass
+
+        tokenizer = self._tokenizer()
+        self.phoneme_cache = install_phoneme_cache(tokenizer) if tokenizer is not None else False
+        self._install_cancel_hooks()
+        if tracing.ENABLED:
+            self._install_trace_hooks(tokenizer)
+
+        backend_info = self.backend
+        if self.weights == "mmap":
+            backend_info += " mmap"
+        if self.quantization:
+            backend_info += f" {self.quantization}"
+        threads_info = f"{self.threads['intra_op']}+{self.threads['interop']} threads"
+        if self.thread_config.cpus:
+            threads_info += f" on cpus {self.threads['cpus']}"
+        self.loaded_info = f"{self.model_name} [{self.source}, {backend_info}, {threads_info}]"
+
+    def _load_torch(self, model_path, config_path):
+        '''Memory-mapped safetensors weights when converted and up to date, else the .pth'''
+        st_path = find_safetensors(config_path) if MMAP_WEIGHTS else None
+        if st_path is not None and is_fresh(st_path, model_path):
+            try:
+                tts = load_mmap_tts(st_path, config_path)
+                self.weights = "mmap"
+                return tts
+            except Exception as e:
+                logger.warning("[mmap] %s: falling back to %s (%s)", st_path, Path(model_path).name, e)
+        return torch_tts(model_path, config_path)
+
+    def _install_cancel_hooks(self):
+        '''Forward pre-hooks on the model's stages, so a cancel lands between them'''
+        if self.tts is None:
+            return
+        synth = getattr(self.tts, "synthesizer", None)
+        model = getattr(synth, "tts_model", None)
+        modules = list(model.children()) if model is not None else []
+        vocoder = getattr(synth, "vocoder_model", None)
+        if vocoder is not None:
+            modules.append(vocoder)
+        for m in modules:
+            m.register_forward_pre_hook(self._cancel_hook)
+
+    def _install_trace_hooks(self, tokenizer):
+        '''Stage spans (AJTTS_TRACE): phonemization, model sub-modules, vocoder'''
+        tracing.trace_method(tokenizer, "text_to_ids", "phonemize")
+        if self.onnx is not None:
+            tracing.trace_method(self.onnx.session, "run", "model.onnx")
+            return
+        synth = getattr(self.tts, "synthesizer", None)
+        # VITS is end to end: its waveform decoder is the vocoder stage
+        tracing.trace_module_stages(getattr(synth, "tts_model", None), "model",
+                                    rename={"waveform_decoder": "vocoder"})
+        tracing.trace_forward(getattr(synth, "vocoder_model", None), "vocoder")
+
+    def _cancel_hook(self, _module, _inputs):
+        if _cancelled(self._cancel):
+            raise SynthesisCancelled()
+
+    def _tokenizer(self):
+        if self.onnx is not None:
+            return self.onnx.tokenizer
+        return getattr(getattr(self.tts.synthesizer, "tts_model", None), "tokenizer", None)
+
+    def memory_bytes(self) -> int:
+        '''Approximate RAM held by the model weights (params + buffers)'''
+        if self.onnx is not None:
+            return self.onnx.memory_bytes()
+        total = 0
+        synth = getattr(self.tts, "synthesizer", None)
+        for name in ("tts_model", "vocoder_model"):
+            module = getattr(synth, name, None)
+            if module is None:
+                continue
+            for t in list(module.parameters()) + list(module.buffers()):
+                total += t.numel() * t.element_size()
+        return total
+
+    @property
+    def sample_rate(self) -> int:
+        if self.onnx is not None:
+            return self.onnx.sample_rate
+        return int(self.tts.synthesizer.output_sample_rate)
+
+    def _run_backend(self, text: str, split: bool, cancel=None):
+        with self._lock:
+            if _cancelled(cancel):
+                raise SynthesisCancelled()
+            self._cancel = cancel
+            try:
+                return self._run_backend_locked(text, split, cancel)
+            finally:
+                self._cancel = None
+
+    def _run_backend_locked(self, text: str, split: bool, cancel=None):
+        if self.onnx is None:
+            return self.tts.tts(text=text, split_sentences=split)
+        # Mirror Coqui's Synthesizer.tts: each sentence followed by 10000 zero samples
+        wavs = []
+        for sentence in (split_sentences(text) if split else [text]):
+            wavs.append(self.onnx.synthesize(sentence, cancel=cancel))
+            wavs.append(np.zeros(10000, dtype=np.float32))
+        return np.concatenate(wavs) if wavs else np.zeros(0, dtype=np.float32)
+
+    def warm_up(self, texts=None, runs: int = None) -> dict:
+        '''Run a few dummy utterances (no cache, no last_text) so the first real one is fast'''
+        runs = WARMUP_RUNS if runs is None else runs
+        lang = "es" if "/es/" in self.model_name else "en"
+        texts = texts or WARMUP_TEXTS[lang]
+        rtfs = []
+        for i in range(runs):
+            rtfs.append(self._timed_rtf(self._synthesize_raw, texts[i % len(texts)], False)[1])
+        self.warmup_stats = {
+            "runs": runs,
+            "cold_rtf": rtfs[0] if rtfs else None,
+            "warm_rtf": min(rtfs[1:]) if len(rtfs) > 1 else None,
+            "first_request_rtf": None, # filled by the first real request
+        }
+        logger.info("[warm-up] %s: %s", self.model_name, self.warmup_stats)
+        return self.warmup_stats
+
+    def _timed_rtf(self, fn, text, split):
+        t0 = time.perf_counter()
+        wav = fn(text, split)
+        audio_s = len(wav) / float(self.sample_rate)
+        return wav, ((time.perf_counter() - t0) / audio_s if audio_s else 0.0)
+
+    def _infer(self, text: str, split_sentences: bool = True, cancel=None):
+        '''Run the model on text, returns float32 samples'''
+        stats = self.warmup_stats
+        if stats is None or stats["first_request_rtf"] is not None:
+            return self._synthesize_raw(text, split_sentences, cancel)
+        run = lambda t, s: self._synthesize_raw(t, s, cancel)
+        wav, stats["first_request_rtf"] = self._timed_rtf(run, text, split_sentences)
+        return wav
+
+    def _synthesize_raw(self, text: str, split_sentences: bool = True, cancel=None):
         try:
-            self.tts.tts_to_file(text=text, file_path=str(tmp_path))
+            wav = self._run_backend(text, split_sentences, cancel)
         except TypeError as e:
             if "andword" in str(e):
                 logger.warning("[andword] retrying with sanitized text")
                 safe_text = sanitize_for_andword_bug(text)
                 if not safe_text.strip():
                     safe_text = " "
-                self.tts.tts_to_file(text=safe_text, file_path=str(tmp_path))
+                wav = self._run_backend(safe_text, split_sentences, cancel)
             else:
                 raise
         except AttributeError:
-            raise RuntimeError("This TTS backend lacks tts_to_file(...)")
-        return str(tmp_path)
+            raise RuntimeError("This TTS backend lacks tts(...)")
+        return to_float32(wav)
 
-    def speak_text(self, text: str):
-        '''Generate audio, speak, delete'''
-        if not text or not text.strip():
-            print("No text to speak.")
-            return
-        
-        self.last_text = text
+    def supports_batching(self) -> bool:
+        if self.onnx is not None:
+            return False # the exported graph has no per-item output lengths
+        model = getattr(self.tts.synthesizer, "tts_model", None)
+        return type(model).__name__ == "Vits" and getattr(model, "tokenizer", None) is not None
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-            wav_path = tmp.name
+    @staticmethod
+    def _text_to_ids(tokenizer, text: str):
+        try:
+            return tokenizer.text_to_ids(text)
+        except TypeError as e:
+            if "andword" not in str(e):
+                raise
+            logger.warning("[andword] retrying with sanitized text")
+            return tokenizer.text_to_ids(sanitize_for_andword_bug(text).strip() or " ")
+
+    def _infer_batch(self, texts: list[str], cancel=None) -> list:
+        '''One padded forward pass for several sentences (VITS). Same output as _infer(t, False)'''
+        import torch
+        synth = self.tts.synthesizer
+        model = synth.tts_model
+        tokenizer = model.tokenizer
+
+        ids = [self._text_to_ids(tokenizer, t) for t in texts]
+        lengths = torch.tensor([len(i) for i in ids], dtype=torch.long)
+        pad_id = getattr(tokenizer, "pad_id", None) or 0
+        x = torch.full((len(ids), int(lengths.max())), pad_id, dtype=torch.long)
+        for row, seq in enumerate(ids):
+            x[row, :len(seq)] = torch.as_tensor(seq, dtype=torch.long)
+
+        aux = {"x_lengths": lengths, "d_vectors": None, "speaker_ids": None,
+               "language_ids": None, "durations": None}
+        with self._lock, torch.inference_mode():
+            if _cancelled(cancel):
+                raise SynthesisCancelled()
+            self._cancel = cancel
+            try:
+                out = model.inference(x, aux_input=aux)
+            finally:
+                self._cancel = None
+
+        # Predicted spectrogram lengths -> waveform lengths
+        hop = model.config.audio.hop_length
+        wav_lens = (out["y_mask"].sum(dim=(1, 2)) * hop).long().tolist()
+        wavs = out["model_outputs"][:, 0, :].cpu().numpy()
+
+        audio_cfg = synth.tts_config.audio
+        trim = "do_trim_silence" in audio_cfg and bool(audio_cfg["do_trim_silence"])
+        results = []
+        for row, n in enumerate(wav_lens):
+            wav = wavs[row, :n]
+            if trim:
+                wav = wav[: model.ap.find_endpoint(wav)]
+            results.append(to_float32(wav))
+        return results
+
+    def synthesize_batch(self, sentences: list[str], batch_size: int = None, cancel=None) -> list:
+        '''Raw samples per sentence, in order. Batched for VITS, one by one otherwise.
+        Raises SynthesisCancelled once cancel is set'''
+        batch_size = max(1, batch_size or BATCH_SIZE)
+        results = [None] * len(sentences)
+        todo = []
+        for i, text in enumerate(sentences):
+            key = self._cache_key(text, split_sentences=False)
+            hit = self.audio_cache.get(key) if key else None
+            if hit is not None:
+                results[i] = hit[0]
+            else:
+                todo.append(i)
 
-        #Audio generation
-        self.tts.tts_to_file(text=text, file_path=wav_path)
+        if batch_size > 1 and self.supports_batching():
+            # Similar lengths together -> little padding
+            todo.sort(key=lambda i: len(sentences[i]))
+            run = lambda texts: self._infer_batch(texts, cancel)
+        else:
+            batch_size = 1
+            run = lambda texts: [self._infer(texts[0], split_sentences=False, cancel=cancel)]
+
+        for start in range(0, len(todo), batch_size):
+            if _cancelled(cancel):
+                raise SynthesisCancelled()
+            idx = todo[start:start + batch_size]
+            for i, wav in zip(idx, run([sentences[i] for i in idx])):
+                results[i] = wav
+                key = self._cache_key(sentences[i], split_sentences=False)
+                if key:
+                    self.audio_cache.put(key, wav, self.sample_rate)
+        return results
+
+    def synthesize_long(self, text: str, batch_size: int = None, cancel=None):
+        '''Throughput path for long texts: split, batch, join. Returns (samples, sample_rate)'''
+        if not text:
+            raise ValueError("Empty text")
+        self.last_text = text
+        sr = self.sample_rate
+        sentences = split_sentences(text)
+        wavs = self.synthesize_batch(sentences, batch_size, cancel)
+        return np.concatenate([sentence_chunk(w, sr) for w in wavs]), sr
+
+    def _synthesis_params(self) -> dict:
+        '''Everything besides model and text that changes the output audio'''
+        return {"speaker": None, "language": None, "backend": self.backend,
+                "quantization": self.quantization}
+
+    def _cache_key(self, text: str, split_sentences: bool = True):
+        if self.audio_cache is None:
+            return None
+        params = dict(self._synthesis_params(), split_sentences=split_sentences)
+        return cache_key(self.identity, text, params)
+
+    def _infer_cached(self, text: str, split_sentences: bool = True, cancel=None):
+        '''_infer behind the audio cache; a hit never touches the model'''
+        key = self._cache_key(text, split_sentences)
+        if key is None:
+            return self._infer(text, split_sentences, cancel)
+        hit = self.audio_cache.get(key)
+        if hit is not None:
+            return hit[0]
+        samples = self._infer(text, split_sentences, cancel) # cancelled -> nothing cached
+        self.audio_cache.put(key, samples, self.sample_rate)
+        return samples
+
+    def synthesize_to_pcm(self, text: str, cancel=None):
+        """Returns (samples, sample_rate); float32 mono samples, nothing touches the disk.
+        Raises SynthesisCancelled once cancel is set"""
+        if not text:
+            raise ValueError("Empty text")
+        self.last_text = text
+        with tracing.span("synthesize", chars=len(text)):
+            return self._infer_cached(text, cancel=cancel), self.sample_rate
 
-        #Play Audio
-        self.play_audio(wav_path)
+    def iter_pcm_chunks(self, text: str, cancel=None):
+        """Yields (samples, sample_rate) sentence by sentence, ready to be played back to back.
+        cancel: threading.Event-like (CancelToken); once set the stream just ends, and the
+        sentence in progress stops at its next model stage"""
+        if not text:
+            raise ValueError("Empty text")
+        self.last_text = text
+        sr = self.sample_rate
+        for sentence in split_sentences(text):
+            if _cancelled(cancel):
+                return
+            try:
+                with tracing.span("synthesize.sentence", chars=len(sentence)):
+                    samples = self._infer_cached(sentence, split_sentences=False, cancel=cancel)
+            except SynthesisCancelled:
+                return
+            with tracing.span("pcm.chunk"):
+                chunk = sentence_chunk(samples, sr)
+            yield chunk, sr
+
+    def export_wav(self, text: str, file_path: str) -> str:
+        '''Synthesize text and write it to file_path as 16-bit WAV'''
+        samples, sr = self.synthesize_to_pcm(text)
+        return write_wav(file_path, samples, sr)
 
-        #Delete audio
+    def synthesize_to_wav(self, text: str) -> str:
+        """Returns a temporal WAV(path) with the speech. Prefer synthesize_to_pcm"""
+        tmp = tempfile.NamedTemporaryFile(prefix="ajtts_", suffix=".wav", delete=False)
+        tmp_path = Path(tmp.name)
+        tmp.close()
         try:
-            Path(wav_path).unlink()
-        except FileNotFoundError:
-            pass
+            return self.export_wav(text, str(tmp_path))
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def speak_text(self, text: str):
+        '''Generate audio and speak it, straight from memory'''
+        if not text or not text.strip():
+            print("No text to speak.")
+            return
+
+        samples, sr = self.synthesize_to_pcm(text)
+        self.play_pcm(samples, sr)
 
     def repeat_last(self):
         '''Repeat last saved text'''
@@ -318,6 +756,49 @@ class AquaTTS:
         else:
             subprocess.run(["afplay", file_path]) #mac OS
 
+    def play_pcm(self, samples, sample_rate: int):
+        '''Play samples using the system audio, without a temp file where possible'''
+        if platform.system() == "Linux":
+            subprocess.run(
+                ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "1", "-r", str(int(sample_rate))],
+                input=to_int16(samples).tobytes()
+            )
+        elif platform.system() == "Windows":
+            import winsound
+            winsound.PlaySound(wav_bytes(samples, sample_rate), winsound.SND_MEMORY)
+        else:
+            # afplay cannot read from stdin
+            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+                tmp.write(wav_bytes(samples, sample_rate))
+            try:
+                self.play_audio(tmp.name)
+            finally:
+                Path(tmp.name).unlink(missing_ok=True)
+
+def split_sentences(text: str, max_chars: int = SENTENCE_MAX_CHARS) -> list[str]:
+    '''Split repaired/normalized text into chunks for streaming synthesis'''
+    pieces = []
+    for sent in _SENTENCE_END.split(text.strip()):
+        sent = sent.strip()
+        while len(sent) > max_chars:
+            cut = sent.rfind(", ", 0, max_chars)
+            if cut < max_chars // 2:
+                cut = sent.rfind(" ", 0, max_chars)
+            # On a separator the piece keeps it (cut + 1); a hard cut takes exactly max_chars
+            end = cut + 1 if cut > 0 else max_chars
+            pieces.append(sent[:end].strip())
+            sent = sent[end:].strip()
+        if sent:
+            pieces.append(sent)
+
+    chunks = []
+    for p in pieces:
+        if chunks and len(chunks[-1]) < SENTENCE_MIN_CHARS and len(chunks[-1]) + len(p) < max_chars:
+            chunks[-1] = f"{chunks[-1]} {p}"
+        else:
+            chunks.append(p)
+    return chunks
+
 def repair_text(text: str) -> str:
     text = re.sub(r"-\n", "", text)
     text = re.sub(r"(?<![.!?])\n", " ", text)
@@ -326,18 +807,36 @@ def repair_text(text: str) -> str:
 
     return text.strip()
 
+def prepare_text(text: str, model_name: str) -> str:
+    '''Clipboard/raw text -> what the voice should read: repaired, numbers normalized per language'''
+    from app.normalize_es import normalize_es_numbers
+    from app.normalize_en import normalize_text_en
+
+    with tracing.span("text.repair"):
+        fixed_text = repair_text(text)
+    try:
+        model_name = str(model_name or "").lower()
+        with tracing.span("text.normalize"):
+            if model_name.startswith("tts_models/es/"):
+                fixed_text = normalize_es_numbers(fixed_text, currency_default="CRC")
+            elif model_name.startswith("tts_models/en/"):
+                fixed_text = safe_normalize(normalize_text_en, fixed_text)
+                fixed_text = sanitize_for_andword_bug(fixed_text)
+    except Exception as e:
+        print(f"[normalizer warning] {e}")
+    return fixed_text
+
 def debug_model_status(model_id: str) -> str:
     folder = ASSETS_MODELS_DIR / _normalize_name(model_id)
+    entry = get_model_index().entry(folder) if folder.exists() else None
     parts = [f"[check] {model_id}",
              f"assets_dir: {folder}",
-             f"exists: {folder.exists()}"]
+             f"exists: {entry is not None}"]
     
-    if folder.exists():
-        hits_w = []
-        for pat in ("*.pth", "*.pt", "*.onnx"):
-            hits_w += [p.name for p in folder.glob(pat)]
-        parts.append(f"weights: {hits_w or '—'}")
-        parts.append(f"has_config: {(folder / 'config.json').exists()}")
+    if entry is not None:
+        parts.append(f"weights: {entry['weights'] or '—'}")
+        parts.append(f"has_config: {entry['config'] is not None}")
     cdir = _cache_dir(model_id)
-    parts.append(f"cache_dir: {cdir} (exists: {cdir.exists()})")
+    cfolder, _ = get_model_index().lookup(_normalize_name(model_id), roots=[CACHE_DIR], refresh=False)
+    parts.append(f"cache_dir: {cdir} (exists: {cfolder is not None})")
     return "\n".join(parts)